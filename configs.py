@@ -10,4 +10,7 @@ with open("config/collector_exclude_config.json", "r") as f:
     collector_exclude_config = json.load(f)
 
 with open("config/collector_config.json", "r") as f:
-    collector_config = json.load(f)
\ No newline at end of file
+    collector_config = json.load(f)
+
+with open("config/io_config.json", "r") as f:
+    io_config = json.load(f)
\ No newline at end of file
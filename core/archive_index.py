@@ -0,0 +1,226 @@
+import os
+import json
+from typing import Optional
+
+from core.hashing import compute_file_hash
+from core.io_scheduler import IOScheduler
+
+
+class ArchiveIndex:
+    """
+    Persistent content index of an archive folder, keyed by size and hash.
+
+    The index lives in a JSON file inside the archive, together with the
+    mtime of every archive folder. On load only folders whose mtime changed
+    are listed again; the stored entries of the other folders are trusted
+    without a stat. Hashes are only computed on demand, when a candidate
+    file has the same size as something already archived, and a stored hash
+    is only reused after checking that the file's size and mtime still match.
+
+    `save` still rewrites the whole JSON file, but only when something changed.
+    """
+
+    INDEX_FILENAME = ".archivador_index.json"
+    SKIPPED_SUFFIXES = (".part", ".tmp")
+
+    def __init__(
+        self,
+        root: str,
+        index_filename: str = INDEX_FILENAME,
+        io_scheduler: Optional[IOScheduler] = None,
+    ):
+        """
+        Args:
+            root (str): Archive folder to index.
+            index_filename (str): Name of the index file inside `root`.
+            io_scheduler (IOScheduler): Optional scheduler for hash reads.
+        """
+        self.root = os.path.abspath(root)
+        self.index_path = os.path.join(self.root, index_filename)
+        self.entries = {}  # relpath -> [size, mtime_ns, hash | None]
+        self.by_size = {}  # size -> set of relpaths
+        self.dirs = {}  # reldir -> [mtime_ns, [subdir names]]
+        self.dirs_listed = 0
+        self.hashes_computed = 0
+        self._dirty = False
+        self.io_scheduler = io_scheduler
+
+    def load(self) -> None:
+        """Read the stored index and refresh the folders that changed since."""
+        stored, stored_dirs = {}, {}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                stored = data.get("entries", {})
+                stored_dirs = data.get("dirs", {})
+            except (OSError, ValueError):
+                stored, stored_dirs = {}, {}
+
+        stored_by_dir = {}
+        for rel_path, entry in stored.items():
+            stored_by_dir.setdefault(os.path.dirname(rel_path), []).append(
+                (rel_path, entry)
+            )
+
+        self.entries = {}
+        self.by_size = {}
+        self.dirs = {}
+        self.dirs_listed = 0
+        self._dirty = False
+
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            try:
+                mtime = os.stat(os.path.join(self.root, rel_dir)).st_mtime_ns
+            except OSError:
+                self._dirty = True
+                continue
+
+            previous = stored_dirs.get(rel_dir)
+            if previous and previous[0] == mtime:
+                subdirs = previous[1]
+                for rel_path, entry in stored_by_dir.get(rel_dir, []):
+                    self._set(rel_path, entry[0], entry[1], entry[2])
+            else:
+                subdirs, files = self._list_dir(rel_dir, stored)
+                # Writing the index itself touches the root folder: only a
+                # different listing makes the stored index out of date.
+                if (
+                    previous is None
+                    or sorted(previous[1]) != sorted(subdirs)
+                    or files != dict(stored_by_dir.get(rel_dir, []))
+                ):
+                    self._dirty = True
+
+            self.dirs[rel_dir] = [mtime, subdirs]
+            stack.extend(os.path.join(rel_dir, name) for name in subdirs)
+
+        if len(self.dirs) != len(stored_dirs):
+            self._dirty = True
+
+    def _list_dir(self, rel_dir: str, stored: dict) -> tuple[list[str], dict]:
+        """List one changed folder, keeping the hashes of unchanged files."""
+        subdirs = []
+        files = {}
+        try:
+            with os.scandir(os.path.join(self.root, rel_dir)) as it:
+                for item in it:
+                    try:
+                        if item.is_dir(follow_symlinks=False):
+                            subdirs.append(item.name)
+                            continue
+                        # Links made by FileCollector ('link' mode) point at
+                        # content that is already indexed, and '.part'/'.tmp'
+                        # files are unfinished copies or index writes.
+                        if (
+                            not item.is_file(follow_symlinks=False)
+                            or item.name.endswith(self.SKIPPED_SUFFIXES)
+                            or item.path == self.index_path
+                        ):
+                            continue
+                        st = item.stat()
+                    except OSError:
+                        continue
+                    rel_path = os.path.join(rel_dir, item.name)
+                    old = stored.get(rel_path)
+                    if old and old[0] == st.st_size and old[1] == st.st_mtime_ns:
+                        self._set(rel_path, old[0], old[1], old[2])
+                    else:
+                        self._set(rel_path, st.st_size, st.st_mtime_ns, None)
+                    files[rel_path] = self.entries[rel_path]
+        except OSError:
+            pass
+        self.dirs_listed += 1
+        return subdirs, files
+
+    def save(self) -> None:
+        """Write the index atomically next to the archived files, if it changed."""
+        if not self._dirty and os.path.exists(self.index_path):
+            return
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": self.entries, "dirs": self.dirs}, f)
+        os.replace(tmp_path, self.index_path)
+        self._dirty = False
+
+    def _set(self, rel_path: str, size: int, mtime_ns: int, file_hash: Optional[str]):
+        self.entries[rel_path] = [size, mtime_ns, file_hash]
+        self.by_size.setdefault(size, set()).add(rel_path)
+
+    def _entry_hash(self, rel_path: str, size: int) -> Optional[str]:
+        entry = self.entries[rel_path]
+        # Files of trusted folders were not stat'ed on load, and rewriting a
+        # file in place does not change its folder's mtime: check it here.
+        try:
+            st = os.stat(os.path.join(self.root, rel_path))
+        except OSError:
+            self.by_size[entry[0]].discard(rel_path)
+            del self.entries[rel_path]
+            self._dirty = True
+            return None
+        if st.st_size != entry[0] or st.st_mtime_ns != entry[1]:
+            self.by_size[entry[0]].discard(rel_path)
+            self._set(rel_path, st.st_size, st.st_mtime_ns, None)
+            self._dirty = True
+            entry = self.entries[rel_path]
+        if entry[0] != size:
+            return None
+        if entry[2] is None:
+            try:
+                entry[2] = compute_file_hash(
+                    os.path.join(self.root, rel_path), scheduler=self.io_scheduler
+                )
+                self.hashes_computed += 1
+                self._dirty = True
+            except OSError:
+                return None
+        return entry[2]
+
+    def has_size(self, size: int) -> bool:
+        """Tell whether any archived file has exactly `size` bytes."""
+        return bool(self.by_size.get(size))
+
+    def find(
+        self, file_path: str, size: int, file_hash: Optional[str] = None
+    ) -> tuple[Optional[str], Optional[str]]:
+        """
+        Look for an archived file with the same content as `file_path`.
+
+        The file is only hashed when its size matches an archived file.
+
+        Args:
+            file_path (str): Candidate file outside the archive.
+            size (int): Size of the candidate in bytes.
+            file_hash (str): Hash of the candidate, if already known.
+
+        Returns:
+            tuple: (absolute path of the archived copy or None,
+                    hash of the candidate or None if it was not needed).
+        """
+        candidates = self.by_size.get(size)
+        if not candidates:
+            return None, None
+
+        if file_hash is None:
+            file_hash = compute_file_hash(file_path, scheduler=self.io_scheduler)
+            self.hashes_computed += 1
+        for rel_path in sorted(candidates):
+            if self._entry_hash(rel_path, size) == file_hash:
+                return os.path.join(self.root, rel_path), file_hash
+        return None, file_hash
+
+    def add(self, file_path: str, file_hash: Optional[str] = None) -> None:
+        """
+        Register a file that was just placed in the archive.
+
+        Args:
+            file_path (str): Absolute path of the archived file.
+            file_hash (str): Its hash, if already known.
+        """
+        st = os.stat(file_path)
+        rel_path = os.path.relpath(file_path, self.root)
+        self._set(rel_path, st.st_size, st.st_mtime_ns, file_hash)
+        self._dirty = True
@@ -0,0 +1,269 @@
+import os
+import re
+import time
+import tarfile
+from multiprocessing import Pool
+from typing import Literal, Optional
+
+
+# Formats that are already compressed: running them through lzma/zlib costs
+# CPU and saves almost nothing, so they go to uncompressed volumes.
+STORED_EXTS = {
+    "jpg", "jpeg", "png", "gif", "webp", "heic", "jfif",
+    "mp4", "mkv", "mov", "avi", "wmv", "flv", "webm", "mpeg", "3gp",
+    "mp3", "aac", "m4a", "ogg", "opus", "flac", "wma",
+    "zip", "rar", "7z", "gz", "xz", "bz2", "lz", "zst", "tgz",
+    "docx", "xlsx", "pptx", "odt", "ods", "odp", "epub", "cbz", "cbr",
+    "jar", "apk", "msi", "dmg", "iso",
+}
+
+_TAR_MODES = {"xz": ("w:xz", ".tar.xz"), "gz": ("w:gz", ".tar.gz"), None: ("w", ".tar")}
+
+
+def pack_volume(volume: dict) -> dict:
+    """
+    Write one tar volume, streaming each source file into the compressor.
+
+    Meant to run inside a worker process. The volume is written to a
+    temporary name, synced and renamed when complete. A member that fails
+    partway (e.g. a source that shrinks while it is read) leaves a
+    truncated entry in the stream that would misalign every later member,
+    so any member error aborts the whole volume: the temporary file is
+    deleted and no source is reported as packed.
+
+    Args:
+        volume (dict): Volume spec from `ArchivePacker.plan_volumes` with
+            'path', 'compression', 'level' and 'members' [(src, arcname, size)].
+
+    Returns:
+        dict: path, packed sources, input and output bytes, errors. On
+            failure 'packed' is empty and 'output_bytes' is 0.
+    """
+    mode, _ = _TAR_MODES[volume["compression"]]
+    if volume["compression"] == "xz":
+        options = {"preset": volume["level"]}
+    elif volume["compression"] == "gz":
+        options = {"compresslevel": volume["level"]}
+    else:
+        options = {}
+
+    tmp_path = volume["path"] + ".part"
+    packed = []
+    input_bytes = 0
+    started = time.time()
+
+    try:
+        with tarfile.open(tmp_path, mode, **options) as tar:
+            for src, arcname, size in volume["members"]:
+                try:
+                    tar.add(src, arcname=arcname, recursive=False)
+                except Exception as e:
+                    raise OSError(f"{src}: {e}") from e
+                packed.append(src)
+                input_bytes += size
+        with open(tmp_path, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, volume["path"])
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return {
+            "path": volume["path"],
+            "compression": volume["compression"],
+            "packed": [],
+            "input_bytes": 0,
+            "output_bytes": 0,
+            "seconds": time.time() - started,
+            "errors": [f"{volume['path']}: volume not written ({e})"],
+        }
+
+    return {
+        "path": volume["path"],
+        "compression": volume["compression"],
+        "packed": packed,
+        "input_bytes": input_bytes,
+        "output_bytes": os.path.getsize(volume["path"]),
+        "seconds": time.time() - started,
+        "errors": [],
+    }
+
+
+class ArchivePacker:
+    """
+    Packs files into per-category tar volumes for cold storage.
+
+    Files of each category are split into volumes of roughly `volume_size`
+    input bytes; already-compressed formats go to plain '.tar' volumes and
+    the rest to '.tar.xz' or '.tar.gz'. Volumes are written in parallel by a
+    process pool, one volume per worker, so compression scales with cores.
+    """
+
+    def __init__(
+        self,
+        dest_path: str,
+        compression: Optional[Literal["xz", "gz"]] = "xz",
+        volume_size: int = 1024**3,
+        level: int = 6,
+        workers: Optional[int] = None,
+        remove_sources: bool = True,
+    ):
+        """
+        Args:
+            dest_path (str): Folder where '<category>/' volume folders are created.
+            compression (str): 'xz' (lzma), 'gz' (zlib) or None for plain tar.
+            volume_size (int): Maximum input bytes per volume. A single file
+                larger than this gets a volume of its own.
+            level (int): Compression level (0-9).
+            workers (int): Worker processes. Defaults to the CPU count.
+            remove_sources (bool): Delete each source once its volume is complete.
+        """
+        if compression not in _TAR_MODES:
+            raise ValueError(f"Invalid compression: {compression}")
+
+        self.dest_path = os.path.abspath(dest_path)
+        self.compression = compression
+        self.volume_size = volume_size
+        self.level = level
+        self.workers = workers or os.cpu_count() or 1
+        self.remove_sources = remove_sources
+
+        self.volumes = []
+        self.errors = []
+        self.start_time = None
+        self.end_time = None
+
+    def _next_volume_number(self, folder: str, category: str) -> int:
+        # Continue numbering after volumes left by earlier runs
+        pattern = re.compile(rf"^{re.escape(category)}_(\d+)\.tar")
+        numbers = [
+            int(m.group(1))
+            for name in (os.listdir(folder) if os.path.isdir(folder) else [])
+            if (m := pattern.match(name))
+        ]
+        return max(numbers, default=0) + 1
+
+    def plan_volumes(self, category: str, members: list[tuple[str, str]]) -> list[dict]:
+        """
+        Group the files of one category into volume specs.
+
+        Args:
+            category (str): Category name (also the volume folder name).
+            members (list): (source path, name inside the archive) pairs.
+
+        Returns:
+            list[dict]: Volume specs for `pack_volume`.
+        """
+        folder = os.path.join(self.dest_path, category)
+        os.makedirs(folder, exist_ok=True)
+        number = self._next_volume_number(folder, category)
+
+        groups = {None: [], self.compression: []}
+        for src, arcname in members:
+            try:
+                size = os.path.getsize(src)
+            except OSError as e:
+                self.errors.append(f"{src}: {e}")
+                continue
+            ext = os.path.splitext(src)[1][1:].lower()
+            kind = None if ext in STORED_EXTS else self.compression
+            groups[kind].append((src, arcname, size))
+
+        volumes = []
+        for kind, files in groups.items():
+            current, current_size = [], 0
+            for member in files:
+                if current and current_size + member[2] > self.volume_size:
+                    volumes.append((kind, current))
+                    current, current_size = [], 0
+                current.append(member)
+                current_size += member[2]
+            if current:
+                volumes.append((kind, current))
+
+        specs = []
+        for kind, files in volumes:
+            _, suffix = _TAR_MODES[kind]
+            specs.append(
+                {
+                    "path": os.path.join(folder, f"{category}_{number:04d}{suffix}"),
+                    "compression": kind,
+                    "level": self.level,
+                    "members": files,
+                }
+            )
+            number += 1
+        return specs
+
+    def pack(self, members_by_category: dict[str, list[tuple[str, str]]]) -> list[dict]:
+        """
+        Plan and write the volumes of every category in parallel.
+
+        Args:
+            members_by_category (dict): {category: [(source path, arcname)]}.
+
+        Returns:
+            list[dict]: Result of each written volume. Volumes that failed
+                are left out and their sources are not removed.
+        """
+        self.start_time = time.time()
+
+        specs = []
+        for category, members in members_by_category.items():
+            specs.extend(self.plan_volumes(category, members))
+
+        if specs:
+            workers = min(self.workers, len(specs))
+            with Pool(processes=workers) as pool:
+                for result in pool.imap_unordered(pack_volume, specs):
+                    self.errors.extend(result["errors"])
+                    if not result["packed"]:
+                        continue  # Aborted volume: its sources stay in place
+                    self.volumes.append(result)
+                    if self.remove_sources:
+                        self._remove_sources(result["packed"])
+
+        self.end_time = time.time()
+        return self.volumes
+
+    def _remove_sources(self, paths: list[str]) -> None:
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError as e:
+                self.errors.append(f"{path}: {e}")
+
+    def _get_results(self) -> dict:
+        """
+        Return a summary of the packing.
+
+        Returns:
+            dict: Contains:
+                - volumes (list): Paths of the written volumes.
+                - total_files (int): Files packed.
+                - input_bytes (int): Bytes read from the sources.
+                - output_bytes (int): Bytes written to volumes.
+                - compression_ratio (float): output / input.
+                - bytes_per_sec (float): Input bytes archived per second.
+                - errors (list): Files that could not be packed or removed.
+        """
+        input_bytes = sum(v["input_bytes"] for v in self.volumes)
+        output_bytes = sum(v["output_bytes"] for v in self.volumes)
+        duration = (
+            self.end_time - self.start_time
+            if self.start_time and self.end_time
+            else None
+        )
+
+        return {
+            "volumes": sorted(v["path"] for v in self.volumes),
+            "total_files": sum(len(v["packed"]) for v in self.volumes),
+            "input_bytes": input_bytes,
+            "output_bytes": output_bytes,
+            "compression_ratio": (
+                round(output_bytes / input_bytes, 3) if input_bytes else None
+            ),
+            "bytes_per_sec": (
+                round(input_bytes / duration) if duration else None
+            ),
+            "errors": self.errors.copy(),
+        }
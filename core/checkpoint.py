@@ -0,0 +1,254 @@
+import os
+import json
+import time
+import threading
+from typing import Optional
+
+from core.transfer import partial_path
+
+
+class Checkpoint:
+    """
+    Append-only state file that lets long runs resume after an interruption.
+
+    Records (computed hashes, completed moves, finished folders) are kept in
+    memory and appended to the file as JSON lines in batches, either every
+    `batch_size` records or every `interval` seconds. A truncated last line
+    left by a crash is ignored on load.
+
+    Resuming is idempotent: cached hashes are only reused when the file's
+    size and mtime are unchanged, and a recorded move only counts if the
+    destination still exists and the source is gone. Copies across devices
+    are recorded as planned (and written at once) before they start, so a
+    copy that was in flight can be finished or cleaned up on resume.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        job: str,
+        target: str,
+        batch_size: int = 500,
+        interval: float = 30.0,
+    ):
+        """
+        Args:
+            path (str): Location of the state file.
+            job (str): Kind of run ('collect', 'dedupe', ...).
+            target (str): Folder the run works on. A state file written for
+                another job or folder is discarded.
+            batch_size (int): Records buffered before writing.
+            interval (float): Maximum seconds between writes.
+        """
+        self.path = os.path.abspath(path)
+        self.job = job
+        self.target = os.path.abspath(target)
+        self.batch_size = batch_size
+        self.interval = interval
+
+        self.hashes = {}  # path -> (size, mtime_ns, hash)
+        self.moves = []  # (src, dst, category)
+        self.planned = {}  # dst -> (src, category), copies not yet recorded as done
+        self.conflicts = []  # (src, dst) left alone by recover_planned_moves
+        self.done_dirs = {}  # path -> mtime_ns when it was finished
+        self.resumed = False
+
+        self._pending = []
+        self._last_flush = time.time()
+        self._lock = threading.RLock()
+
+    def load(self) -> None:
+        """Read a previous state file, if it belongs to the same job and folder."""
+        if not os.path.exists(self.path):
+            self._start()
+            return
+
+        records = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break  # Partial line from an interrupted write
+
+        header = records[0] if records else {}
+        if header.get("job") != self.job or header.get("target") != self.target:
+            self._start()
+            return
+
+        for record in records[1:]:
+            kind = record.get("t")
+            if kind == "hash":
+                self.hashes[record["path"]] = (
+                    record["size"],
+                    record["mtime"],
+                    record["hash"],
+                )
+            elif kind == "plan":
+                self.planned[record["dst"]] = (record["src"], record.get("category"))
+            elif kind == "move":
+                self.moves.append((record["src"], record["dst"], record.get("category")))
+                self.planned.pop(record["dst"], None)
+            elif kind == "dir":
+                self.done_dirs[record["path"]] = record["mtime"]
+
+        self.resumed = True
+
+    def _start(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"job": self.job, "target": self.target}) + "\n")
+
+    def _append(self, record: dict) -> None:
+        with self._lock:
+            self._pending.append(json.dumps(record))
+            self.maybe_flush()
+
+    def maybe_flush(self) -> bool:
+        """
+        Write buffered records if the batch is full or the interval elapsed.
+
+        Returns:
+            bool: True if a write happened.
+        """
+        with self._lock:
+            if len(self._pending) >= self.batch_size or (
+                self._pending and time.time() - self._last_flush >= self.interval
+            ):
+                self.flush()
+                return True
+            return False
+
+    def flush(self) -> None:
+        """Append all buffered records to the state file."""
+        with self._lock:
+            if self._pending:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(self._pending) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._pending = []
+            self._last_flush = time.time()
+
+    def cached_hash(self, path: str, st: os.stat_result) -> Optional[str]:
+        """
+        Return the stored hash of a file if it did not change since.
+
+        Args:
+            path (str): Full path of the file.
+            st (os.stat_result): Current stat of the file.
+
+        Returns:
+            str | None: The stored hash, or None if unknown or stale.
+        """
+        cached = self.hashes.get(path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+        return None
+
+    def record_hash(self, path: str, st: os.stat_result, file_hash: str) -> None:
+        self.hashes[path] = (st.st_size, st.st_mtime_ns, file_hash)
+        self._append(
+            {
+                "t": "hash",
+                "path": path,
+                "size": st.st_size,
+                "mtime": st.st_mtime_ns,
+                "hash": file_hash,
+            }
+        )
+
+    def record_plan(self, src: str, dst: str, category: Optional[str] = None) -> None:
+        """
+        Record a copy that is about to start. Written immediately, not batched,
+        so the destination is known even if the run dies during the copy.
+        """
+        with self._lock:
+            self.planned[dst] = (src, category)
+            self._pending.append(
+                json.dumps({"t": "plan", "src": src, "dst": dst, "category": category})
+            )
+            self.flush()
+
+    def record_move(self, src: str, dst: str, category: Optional[str] = None) -> None:
+        self.planned.pop(dst, None)
+        self.moves.append((src, dst, category))
+        self._append({"t": "move", "src": src, "dst": dst, "category": category})
+
+    def recover_planned_moves(self) -> list[tuple[str, str, Optional[str]]]:
+        """
+        Settle the copies that were in flight when the previous run stopped.
+
+        `move_file` only renames a copy to its final name once it is
+        complete, and gives it the source's mtime. An existing destination
+        is therefore a finished copy. If the source is still there with the
+        same size and mtime, it is removed and the move is recorded. If the
+        source changed since, it is kept and the pair is added to
+        `conflicts`, so both versions survive. Without a destination, the
+        partial file is deleted and the source stays in place to be moved
+        again.
+
+        Returns:
+            list: (src, dst, category) of the moves that were completed.
+        """
+        completed = []
+        for dst, (src, category) in list(self.planned.items()):
+            self.planned.pop(dst, None)
+            if not os.path.exists(dst):
+                part_path = partial_path(dst)
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+                continue
+            try:
+                if os.path.exists(src):
+                    src_st, dst_st = os.stat(src), os.stat(dst)
+                    if (src_st.st_size, src_st.st_mtime_ns) != (
+                        dst_st.st_size,
+                        dst_st.st_mtime_ns,
+                    ):
+                        self.conflicts.append((src, dst))
+                        continue
+                    os.remove(src)
+            except OSError:
+                self.conflicts.append((src, dst))
+                continue
+            self.record_move(src, dst, category)
+            completed.append((src, dst, category))
+        return completed
+
+    def record_dir(self, path: str, st: os.stat_result) -> None:
+        self.done_dirs[path] = st.st_mtime_ns
+        self._append({"t": "dir", "path": path, "mtime": st.st_mtime_ns})
+
+    def is_dir_done(self, path: str, st: os.stat_result) -> bool:
+        """
+        Tell whether a folder was fully processed and has not changed since.
+
+        Args:
+            path (str): Full path of the folder.
+            st (os.stat_result): Current stat of the folder.
+
+        Returns:
+            bool: True if its files can be skipped.
+        """
+        return self.done_dirs.get(path) == st.st_mtime_ns
+
+    def completed_moves(self) -> list[tuple[str, str, Optional[str]]]:
+        """
+        Return recorded moves that are still valid on disk.
+
+        Returns:
+            list: (src, dst, category) for moves whose destination exists
+                and whose source no longer exists.
+        """
+        return [
+            (src, dst, category)
+            for src, dst, category in self.moves
+            if os.path.exists(dst) and not os.path.exists(src)
+        ]
+
+    def finish(self) -> None:
+        """Remove the state file once the run completed successfully."""
+        self._pending = []
+        if os.path.exists(self.path):
+            os.remove(self.path)
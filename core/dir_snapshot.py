@@ -0,0 +1,163 @@
+import os
+import json
+import sqlite3
+from typing import Iterator
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value BLOB);
+CREATE TABLE IF NOT EXISTS dirs (
+    path BLOB PRIMARY KEY,
+    mtime INTEGER NOT NULL,
+    subdirs TEXT NOT NULL,
+    files TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    file_count INTEGER NOT NULL,
+    tree_size INTEGER NOT NULL,
+    tree_files INTEGER NOT NULL
+);
+"""
+
+
+class DirSnapshot:
+    """
+    Keyed store of per-directory listings and aggregates, for FolderAnalyzer.
+
+    One row per directory: its mtime, subfolder names, file listing
+    ({name: [size, mtime_ns]}) and the size and file count of its direct
+    files and of its whole subtree. `load` only reads the small columns;
+    listings are read one directory at a time, when that directory changed.
+    Writes are queued and committed in one transaction, so a rerun only
+    rewrites the rows of directories that changed (and the subtree totals
+    of their ancestors).
+
+    Paths are stored with `os.fsencode`, so undecodable names round-trip.
+    """
+
+    def __init__(self, db_path: str, base_path: str):
+        """
+        Args:
+            db_path (str): SQLite database file. A file that is not a
+                database (e.g. an older gzip snapshot) is replaced.
+            base_path (str): Analyzed root. A store written for another
+                root is cleared on load.
+        """
+        self.db_path = os.path.abspath(db_path)
+        self.base_path = os.path.abspath(base_path)
+        self._puts = {}
+        self._totals = {}
+        self._deletes = []
+
+        try:
+            self.conn = self._connect()
+        except sqlite3.DatabaseError:
+            os.remove(self.db_path)
+            self.conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        return conn
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def load(self) -> dict[str, dict]:
+        """
+        Return the stored directories without their listings.
+
+        Returns:
+            dict: {path: {"mtime", "subdirs", "size", "file_count",
+                   "tree_size", "tree_files"}}; empty if the store belongs
+                   to another root.
+        """
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'base'").fetchone()
+        if row is None or os.fsdecode(row[0]) != self.base_path:
+            with self.conn:
+                self.conn.execute("DELETE FROM dirs")
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('base', ?)",
+                    (os.fsencode(self.base_path),),
+                )
+            return {}
+
+        dirs = {}
+        rows = self.conn.execute(
+            "SELECT path, mtime, subdirs, size, file_count, tree_size, tree_files "
+            "FROM dirs"
+        )
+        for path, mtime, subdirs, size, file_count, tree_size, tree_files in rows:
+            dirs[os.fsdecode(path)] = {
+                "mtime": mtime,
+                "subdirs": json.loads(subdirs),
+                "size": size,
+                "file_count": file_count,
+                "tree_size": tree_size,
+                "tree_files": tree_files,
+            }
+        return dirs
+
+    def listing(self, path: str) -> dict:
+        """Return the stored {name: [size, mtime_ns]} of one directory."""
+        row = self.conn.execute(
+            "SELECT files FROM dirs WHERE path = ?", (os.fsencode(path),)
+        ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def iter_listings(self) -> Iterator[tuple[str, dict]]:
+        """Yield (directory, {name: [size, mtime_ns]}) for every stored directory."""
+        for path, files in self.conn.execute("SELECT path, files FROM dirs"):
+            yield os.fsdecode(path), json.loads(files)
+
+    def put(self, path: str, entry: dict) -> None:
+        """Queue the new listing of a directory that was listed again."""
+        self._puts[path] = entry
+
+    def set_totals(self, path: str, tree_size: int, tree_files: int) -> None:
+        """Queue new subtree totals for a directory."""
+        self._totals[path] = (tree_size, tree_files)
+
+    def delete(self, path: str) -> None:
+        """Queue the removal of a directory that no longer exists."""
+        self._deletes.append(path)
+
+    def commit(self) -> None:
+        """Write the queued changes in one transaction."""
+        rows = [
+            (
+                os.fsencode(path),
+                entry["mtime"],
+                json.dumps(entry["subdirs"]),
+                json.dumps(entry["files"]),
+                entry["size"],
+                entry["file_count"],
+                entry["tree_size"],
+                entry["tree_files"],
+            )
+            for path, entry in self._puts.items()
+        ]
+        totals = [
+            (tree_size, tree_files, os.fsencode(path))
+            for path, (tree_size, tree_files) in self._totals.items()
+            if path not in self._puts
+        ]
+
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM dirs WHERE path = ?",
+                [(os.fsencode(path),) for path in self._deletes],
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self.conn.executemany(
+                "UPDATE dirs SET tree_size = ?, tree_files = ? WHERE path = ?", totals
+            )
+        self._puts = {}
+        self._totals = {}
+        self._deletes = []
@@ -1,7 +1,15 @@
 import os
-import hashlib
-import shutil
 import time
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
+
+from core.checkpoint import Checkpoint
+from core.hashing import compute_file_hash
+from core.io_scheduler import IOScheduler
+from core.results_store import ResultStore
+from core.transfer import move_file
+from core.verifier import IntegrityVerifier
 
 
 class DuplicateHandler:
@@ -11,13 +19,32 @@ class DuplicateHandler:
     and returns full results on request.
     """
 
-    def __init__(self, target_folder: str, debug: bool = False):
+    def __init__(
+        self,
+        target_folder: str,
+        debug: bool = False,
+        checkpoint_path: Optional[str] = None,
+        io_scheduler: Optional[IOScheduler] = None,
+        verify: bool = False,
+        result_store: Optional[ResultStore] = None,
+    ):
         """
         Initialize the handler with the target folder and optional debug mode.
 
         Args:
             target_folder (str): Path to the folder to scan.
             debug (bool): Whether to print logs during execution. Default is False.
+            checkpoint_path (str): Optional state file. Computed hashes and
+                moves are saved there in batches so an interrupted run can
+                resume without re-hashing unchanged files.
+            io_scheduler (IOScheduler): Optional scheduler. When given, files
+                are hashed by a thread pool whose active workers and read
+                rate are bounded by the scheduler.
+            verify (bool): After the scan, check every moved duplicate
+                against the hash computed while scanning.
+            result_store (ResultStore): Optional store. Moved duplicates are
+                written there as they are found instead of being kept in
+                `duplicates_list`.
         """
         self.folder = os.path.abspath(target_folder)
         self.duplicates_folder = os.path.join(self.folder, "duplicates")
@@ -25,8 +52,16 @@ class DuplicateHandler:
 
         self.hashes = {}
         self.duplicates_moved = []
+        self.duplicate_count = 0
+        self.result_store = result_store
         self.files_processed = 0
         self.debug = debug
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint = None
+        self.io_scheduler = io_scheduler
+        self.verify = verify
+        self.transfer_log = {}  # destination -> (size, hash)
+        self.verifier = None
         self.start_time = None
         self.end_time = None
 
@@ -51,12 +86,11 @@ class DuplicateHandler:
         Returns:
             str | None: The hash as hex string, or None on failure.
         """
-        hasher = hashlib.sha256()
         try:
-            with open(file_path, "rb") as f:
-                while chunk := f.read(block_size):
-                    hasher.update(chunk)
-            return hasher.hexdigest()
+            if self.io_scheduler is None:
+                return compute_file_hash(file_path, block_size)
+            with self.io_scheduler.slot():
+                return compute_file_hash(file_path, block_size, self.io_scheduler)
         except Exception as e:
             self._log(f"Error reading {file_path}: {e}")
             return None
@@ -68,35 +102,122 @@ class DuplicateHandler:
         """
         self.start_time = time.time()
 
+        if self.checkpoint_path:
+            self.checkpoint = Checkpoint(self.checkpoint_path, "dedupe", self.folder)
+            self.checkpoint.load()
+            self.checkpoint.recover_planned_moves()
+            for src, dst in self.checkpoint.conflicts:
+                self._log(f"[Resume] {src} changed after its copy to {dst}; both kept")
+            for src, _, _ in self.checkpoint.completed_moves():
+                self._record_duplicate(src)
+            if self.checkpoint.resumed:
+                self._log(
+                    f"[Resume] {len(self.checkpoint.hashes)} hashes, "
+                    f"{self.duplicate_count} moves restored"
+                )
+
+        for full_path, file_hash in self._hashed_files():
+            if not file_hash:
+                continue
+
+            self.files_processed += 1
+
+            if file_hash in self.hashes:
+                original = self.hashes[file_hash]
+                self._log(f"[Duplicate] {full_path} is a duplicate of {original}")
+                size = os.path.getsize(full_path) if self.verify else None
+                destination = self._move_to_duplicates(full_path)
+                self._record_duplicate(full_path)
+                if self.verify:
+                    self.transfer_log[destination] = (size, file_hash)
+                if self.checkpoint:
+                    self.checkpoint.record_move(full_path, destination)
+            else:
+                self.hashes[file_hash] = full_path
+
+        if self.checkpoint:
+            self.checkpoint.finish()
+
+        if self.verify:
+            self.verifier = IntegrityVerifier(
+                self.transfer_log, io_scheduler=self.io_scheduler
+            )
+            self.verifier.verify()
+
+        self.end_time = time.time()
+
+    def _record_duplicate(self, file_path: str) -> None:
+        self.duplicate_count += 1
+        if self.result_store is not None:
+            self.result_store.add("duplicates_list", file_path)
+        else:
+            self.duplicates_moved.append(file_path)
+
+    def _iter_files(self) -> Iterator[str]:
+        """Yield every file of the target folder, outside 'duplicates'."""
         for dirpath, _, files in os.walk(self.folder):
             if self.duplicates_folder in dirpath:
                 continue  # Skip the duplicates folder itself
 
             for filename in files:
-                full_path = os.path.join(dirpath, filename)
-                file_hash = self._compute_file_hash(full_path)
+                yield os.path.join(dirpath, filename)
 
-                if not file_hash:
-                    continue
+    def _hashed_files(self, batch_size: int = 256) -> Iterator[tuple[str, str | None]]:
+        """
+        Yield (path, hash) pairs in walk order.
 
-                self.files_processed += 1
+        With an I/O scheduler, each batch of files is hashed by a thread
+        pool; results are still yielded in order, so the first copy found
+        is always the one kept as original.
 
-                if file_hash in self.hashes:
-                    original = self.hashes[file_hash]
-                    self._log(f"[Duplicate] {full_path} is a duplicate of {original}")
-                    self._move_to_duplicates(full_path)
-                    self.duplicates_moved.append(full_path)
-                else:
-                    self.hashes[file_hash] = full_path
+        Args:
+            batch_size (int): Files submitted to the pool at a time.
+        """
+        files = self._iter_files()
+        if self.io_scheduler is None:
+            for full_path in files:
+                yield full_path, self._get_file_hash(full_path)
+            return
 
-        self.end_time = time.time()
+        with ThreadPoolExecutor(max_workers=self.io_scheduler.max_workers) as pool:
+            while batch := list(islice(files, batch_size)):
+                yield from zip(batch, pool.map(self._get_file_hash, batch))
 
-    def _move_to_duplicates(self, file_path: str) -> None:
+    def _get_file_hash(self, file_path: str) -> str | None:
+        """
+        Return the hash of a file, reusing the checkpoint when it is unchanged.
+
+        Args:
+            file_path (str): Full path to the file.
+
+        Returns:
+            str | None: The hash as hex string, or None on failure.
+        """
+        if not self.checkpoint:
+            return self._compute_file_hash(file_path)
+
+        try:
+            st = os.stat(file_path)
+        except OSError as e:
+            self._log(f"Error reading {file_path}: {e}")
+            return None
+
+        file_hash = self.checkpoint.cached_hash(file_path, st)
+        if file_hash is None:
+            file_hash = self._compute_file_hash(file_path)
+            if file_hash:
+                self.checkpoint.record_hash(file_path, st, file_hash)
+        return file_hash
+
+    def _move_to_duplicates(self, file_path: str) -> str:
         """
         Move a duplicate file to the 'duplicates' folder, renaming if needed.
 
         Args:
             file_path (str): Full path of the file to move.
+
+        Returns:
+            str: Final path of the moved file.
         """
         filename = os.path.basename(file_path)
         destination = os.path.join(self.duplicates_folder, filename)
@@ -108,7 +229,20 @@ class DuplicateHandler:
             destination = os.path.join(self.duplicates_folder, new_name)
             counter += 1
 
-        shutil.move(file_path, destination)
+        before_copy = None
+        if self.checkpoint:
+            before_copy = lambda: self.checkpoint.record_plan(file_path, destination)
+        move_file(file_path, destination, self.io_scheduler, before_copy=before_copy)
+        return destination
+
+    def file_hashes(self) -> dict[str, str]:
+        """
+        Return the hashes of the files kept in place (one per distinct content).
+
+        Returns:
+            dict: {file path: SHA-256 hex digest}, e.g. for `FolderAnalyzer(known_hashes=...)`.
+        """
+        return {path: file_hash for file_hash, path in self.hashes.items()}
 
     def _get_results(self) -> dict:
         """
@@ -120,7 +254,10 @@ class DuplicateHandler:
                 - total_files (int): Number of files processed.
                 - unique_files (int): Number of unique files.
                 - duplicate_files (int): Number of files moved as duplicates.
-                - duplicates_list (list): List of moved duplicate file paths.
+                - duplicates_list (list): List of moved duplicate file paths
+                  (empty when they were written to `result_store`).
+                - io_stats (dict | None): Scheduler throughput, if one was used.
+                - verification (dict | None): Integrity check of moved files.
         """
         total_time = (
             (self.end_time - self.start_time)
@@ -132,6 +269,8 @@ class DuplicateHandler:
             "total_time": total_time,
             "total_files": self.files_processed,
             "unique_files": len(self.hashes),
-            "duplicate_files": len(self.duplicates_moved),
+            "duplicate_files": self.duplicate_count,
             "duplicates_list": self.duplicates_moved.copy(),
+            "io_stats": self.io_scheduler.stats() if self.io_scheduler else None,
+            "verification": self.verifier._get_results() if self.verifier else None,
         }
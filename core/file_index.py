@@ -0,0 +1,292 @@
+import os
+import time
+import sqlite3
+from typing import Iterable, Optional
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS files (
+    path BLOB PRIMARY KEY,
+    parent BLOB NOT NULL,
+    top TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL,
+    ctime REAL,
+    inode INTEGER,
+    hash TEXT
+);
+"""
+
+# Bumped when the row format changes; an index of another version is rebuilt
+_FORMAT_VERSION = "2"
+
+_INDEXES = {
+    "idx_files_parent": "parent",
+    "idx_files_top_ext": "top, ext",
+    "idx_files_ext_size": "ext, size",
+    "idx_files_size": "size",
+    "idx_files_mtime": "mtime",
+    "idx_files_hash": "hash",
+}
+
+
+class FileIndex:
+    """
+    SQLite index of the files found by a scan, for instant repeated reports.
+
+    Rows are buffered and written with `executemany` in large transactions.
+    A full rebuild drops the secondary indexes first and recreates them at
+    the end, which is much faster than maintaining them row by row.
+
+    'path' and 'parent' are stored as `os.fsencode` bytes, so files with
+    undecodable names are indexed too; 'top' and 'ext' are display text.
+    Raw `query` results return those columns as bytes (`os.fsdecode`).
+    """
+
+    def __init__(self, db_path: str, base_path: str, batch_size: int = 50000):
+        """
+        Args:
+            db_path (str): SQLite database file.
+            base_path (str): Scanned root; used to compute the top-level folder.
+            batch_size (int): Rows per transaction.
+        """
+        self.db_path = os.path.abspath(db_path)
+        self.base_path = os.path.abspath(base_path)
+        self.batch_size = batch_size
+        self._pending = []
+
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
+
+    def is_empty(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM files LIMIT 1").fetchone() is None
+
+    def matches_base(self) -> bool:
+        """Tell whether the stored rows were scanned from `base_path`, in this format."""
+        meta = dict(self.conn.execute("SELECT key, value FROM meta").fetchall())
+        return (
+            meta.get("base_path") == self._text(self.base_path)
+            and meta.get("version") == _FORMAT_VERSION
+        )
+
+    @staticmethod
+    def _text(value: str) -> str:
+        # SQLite text must be valid UTF-8: undecodable names are escaped
+        return value.encode("utf-8", "backslashreplace").decode("utf-8")
+
+    def begin_rebuild(self) -> None:
+        """Clear the table and drop secondary indexes before a full load."""
+        with self.conn:
+            for name in _INDEXES:
+                self.conn.execute(f"DROP INDEX IF EXISTS {name}")
+            self.conn.execute("DELETE FROM files")
+
+    def finish(self) -> None:
+        """Flush pending rows, (re)create indexes and refresh statistics."""
+        self.flush()
+        with self.conn:
+            for name, columns in _INDEXES.items():
+                self.conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {name} ON files ({columns})"
+                )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES "
+                "('base_path', ?), ('scanned_at', ?), ('version', ?)",
+                (self._text(self.base_path), str(time.time()), _FORMAT_VERSION),
+            )
+        self.conn.execute("ANALYZE")
+
+    def _row(self, path: str, st: os.stat_result) -> tuple:
+        parent = os.path.dirname(path)
+        rel_parent = os.path.relpath(parent, self.base_path)
+        top = "." if rel_parent == "." else rel_parent.split(os.sep, 1)[0]
+        ext = os.path.splitext(path)[1][1:].lower()
+        return (
+            os.fsencode(path),
+            os.fsencode(parent),
+            self._text(top),
+            self._text(ext),
+            st.st_size,
+            st.st_mtime,
+            st.st_ctime,
+            st.st_ino,
+        )
+
+    def add(self, path: str, st: os.stat_result) -> None:
+        """Queue one file for insertion."""
+        self._pending.append(self._row(path, st))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO files "
+                "(path, parent, top, ext, size, mtime, ctime, inode) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                self._pending,
+            )
+        self._pending = []
+
+    def replace_dir(self, folder: str, files: Iterable[tuple[str, os.stat_result]]) -> None:
+        """
+        Replace the rows of the files directly inside `folder`.
+
+        Args:
+            folder (str): Folder that was re-listed.
+            files (iterable): (full path, stat) of its current files.
+        """
+        self.flush()
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM files WHERE parent = ?", (os.fsencode(folder),)
+            )
+        for path, st in files:
+            self.add(path, st)
+
+    def remove_dir(self, folder: str) -> None:
+        """Delete the rows of a folder that no longer exists (not recursive)."""
+        self.flush()
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM files WHERE parent = ?", (os.fsencode(folder),)
+            )
+
+    def set_hashes(self, hashes: dict[str, str]) -> None:
+        """
+        Store known content hashes, e.g. from `DuplicateHandler.file_hashes`.
+        Rows are replaced when their folder is re-listed, which drops hashes
+        that may have become stale.
+
+        Args:
+            hashes (dict): {file path: hex digest}.
+        """
+        self.flush()
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE files SET hash = ? WHERE path = ?",
+                [(file_hash, os.fsencode(path)) for path, file_hash in hashes.items()],
+            )
+
+    def query(self, sql: str, params: tuple = ()) -> list[tuple]:
+        """
+        Run an arbitrary read query against the 'files' table.
+
+        The `path` and `parent` columns are BLOBs written with `os.fsencode`;
+        decode them with `os.fsdecode`.
+        """
+        self.flush()
+        return self.conn.execute(sql, params).fetchall()
+
+    def size_by_extension(self, limit: Optional[int] = None) -> list[tuple]:
+        """
+        Returns:
+            list: (ext, files, bytes) ordered by bytes, largest first.
+        """
+        sql = (
+            "SELECT ext, COUNT(*), SUM(size) FROM files "
+            "GROUP BY ext ORDER BY SUM(size) DESC"
+        )
+        if limit:
+            return self.query(sql + " LIMIT ?", (limit,))
+        return self.query(sql)
+
+    def size_by_extension_per_folder(self) -> list[tuple]:
+        """
+        Returns:
+            list: (top-level folder, ext, files, bytes).
+        """
+        return self.query(
+            "SELECT top, ext, COUNT(*), SUM(size) FROM files "
+            "GROUP BY top, ext ORDER BY top, SUM(size) DESC"
+        )
+
+    def age_histogram(self, buckets_days: tuple = (30, 90, 365, 730, 1825)) -> list[tuple]:
+        """
+        Count files and bytes by age (since last modification).
+
+        Args:
+            buckets_days (tuple): Ascending upper limits of each bucket, in days.
+
+        Returns:
+            list: (label, files, bytes), youngest bucket first.
+        """
+        now = time.time()
+        cases = []
+        params = []
+        previous = 0
+        for days in buckets_days:
+            cases.append(f"WHEN mtime >= ? THEN '{previous}-{days}d'")
+            params.append(now - days * 86400)
+            previous = days
+        label = f"CASE {' '.join(cases)} ELSE '>{previous}d' END"
+
+        rows = self.query(
+            f"SELECT {label} AS bucket, COUNT(*), SUM(size), MAX(mtime) "
+            "FROM files GROUP BY bucket ORDER BY MAX(mtime) DESC",
+            tuple(params),
+        )
+        return [(bucket, files, size) for bucket, files, size, _ in rows]
+
+    def top_n(
+        self,
+        n: int = 20,
+        ext: Optional[str] = None,
+        older_than_days: Optional[float] = None,
+    ) -> list[tuple]:
+        """
+        Largest files, optionally filtered, e.g. "largest PDFs older than 2 years".
+
+        Args:
+            n (int): Number of files.
+            ext (str): Only this extension (without dot).
+            older_than_days (float): Only files not modified for this many days.
+
+        Returns:
+            list: (path, size, mtime), with the path as str.
+        """
+        where = []
+        params = []
+        if ext:
+            where.append("ext = ?")
+            params.append(ext.lower().lstrip("."))
+        if older_than_days is not None:
+            where.append("mtime < ?")
+            params.append(time.time() - older_than_days * 86400)
+
+        sql = "SELECT path, size, mtime FROM files"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY size DESC LIMIT ?"
+        return [
+            (os.fsdecode(path), size, mtime)
+            for path, size, mtime in self.query(sql, tuple(params) + (n,))
+        ]
+
+    def duplicate_candidates(self, min_size: int = 1, limit: int = 100) -> list[tuple]:
+        """
+        Sizes shared by several files; only these need hashing to find duplicates.
+
+        Args:
+            min_size (int): Ignore files smaller than this.
+            limit (int): Maximum number of groups.
+
+        Returns:
+            list: (size, files, bytes that would be freed), most bytes first.
+        """
+        return self.query(
+            "SELECT size, COUNT(*), size * (COUNT(*) - 1) AS wasted FROM files "
+            "WHERE size >= ? GROUP BY size HAVING COUNT(*) > 1 "
+            "ORDER BY wasted DESC LIMIT ?",
+            (min_size, limit),
+        )
@@ -1,16 +1,28 @@
 import os
-import shutil
 import time
 import json
-from typing import Optional, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Literal
 from datetime import datetime
 
+from core.archive_index import ArchiveIndex
+from core.archive_packer import ArchivePacker
+from core.checkpoint import Checkpoint
+from core.hashing import compute_file_hash
+from core.io_scheduler import IOScheduler
+from core.results_store import ResultStore
+from core.transfer import move_file
+from core.verifier import IntegrityVerifier
+
 
 class FileCollector:
     """
     Recorre recursivamente una carpeta origen, identifica archivos por tipo (según una configuración JSON),
     y los mueve a una carpeta destino, organizándolos por tipo de archivo.
     Puede excluir archivos por prefijos o extensiones según configuración.
+    Opcionalmente mantiene un índice de contenido del destino para omitir
+    (o enlazar) archivos que ya estaban archivados en lugar de copiarlos otra vez,
+    o empaquetar cada categoría en volúmenes tar en lugar de carpetas sueltas.
     """
 
     DEFAULT_EXCLUDED_STARTS = ("~", ".", "$")
@@ -22,7 +34,54 @@ class FileCollector:
         dest_path: str,
         config: dict,
         excluded_config: Optional[Dict[str, List[str]]] = None,
+        archived_action: Optional[Literal["skip", "link"]] = None,
+        checkpoint_path: Optional[str] = None,
+        io_scheduler: Optional[IOScheduler] = None,
+        pack: Optional[Literal["xz", "gz", "tar"]] = None,
+        volume_size_mb: int = 1024,
+        verify: bool = False,
+        result_store: Optional[ResultStore] = None,
     ):
+        """
+        Args:
+            source_path (str): Carpeta origen a recorrer.
+            dest_path (str): Carpeta destino donde se agrupan las categorías.
+            config (dict): Categorías y sus extensiones.
+            excluded_config (dict): Prefijos y extensiones a ignorar.
+            archived_action (str): Qué hacer con archivos cuyo contenido ya
+                existe en el destino: 'skip' los deja en el origen, 'link'
+                crea un enlace al archivo archivado y elimina el origen.
+                None (por defecto) los mueve como siempre.
+            checkpoint_path (str): Archivo de estado opcional. Guarda por
+                lotes los movimientos, carpetas terminadas y hashes para
+                poder reanudar una ejecución interrumpida.
+            io_scheduler (IOScheduler): Planificador opcional que limita la
+                velocidad de lectura/copia y muestra el ritmo actual. Con él,
+                las copias de cada carpeta se hacen en un grupo de hilos y
+                cada una ocupa un hueco del planificador, de modo que la
+                concurrencia adaptativa también regula las copias.
+            pack (str): Si se indica, cada categoría se escribe en volúmenes
+                tar ('xz' o 'gz' comprimidos, 'tar' sin comprimir) dentro de
+                `dest_path/<categoría>` y los originales se eliminan. Los
+                archivos empaquetados se cuentan como movidos (con su ruta
+                de origen) y los volúmenes se listan en 'archive'. No admite
+                `io_scheduler`.
+            volume_size_mb (int): Tamaño máximo (de entrada) de cada volumen.
+            verify (bool): Al terminar, comprueba en paralelo que cada archivo
+                movido llegó íntegro, comparando con el hash calculado durante
+                la copia (o ya conocido). No aplica al modo empaquetado.
+            result_store (ResultStore): Almacén opcional. Los archivos
+                movidos, enlazados u omitidos se escriben ahí durante la
+                ejecución en lugar de acumularse en las listas de resultados.
+        """
+        if archived_action not in (None, "skip", "link"):
+            raise ValueError(f"Invalid archived_action: {archived_action}")
+        if pack not in (None, "xz", "gz", "tar"):
+            raise ValueError(f"Invalid pack mode: {pack}")
+        if pack and io_scheduler is not None:
+            # Los volúmenes se escriben en procesos aparte, fuera del planificador
+            raise ValueError("io_scheduler is not supported together with pack")
+
         self.source_path = os.path.abspath(source_path)
         self.dest_path = os.path.abspath(dest_path)
         self.config = config
@@ -37,7 +96,37 @@ class FileCollector:
             else self.DEFAULT_EXCLUDED_EXTS
         )
 
+        self.archived_action = archived_action
+        self.archive_index = None
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint = None
+        self._index_saved_at = 0.0
+        self.io_scheduler = io_scheduler
+        self.packer = (
+            ArchivePacker(
+                self.dest_path,
+                compression=None if pack == "tar" else pack,
+                volume_size=volume_size_mb * 1024**2,
+            )
+            if pack
+            else None
+        )
+        self._pack_queue = {}
+        self._copy_pool = None
+        self._pending_moves = []  # futuros de copias en curso
+        self._reserved = set()  # destinos elegidos cuya copia no terminó
+        self._pending_sizes = set()  # tamaños de las copias en curso
+        self.verify = verify
+        self.transfer_log = {}  # destino -> (tamaño, hash)
+        self.verifier = None
+
+        self.result_store = result_store
         self.moved_files = {}
+        self.moved_counts = {}
+        self.linked_files = {}
+        self.linked_counts = {}
+        self.skipped_files = []
+        self.skipped_count = 0
         self.errors = []
         self.start_time = None
         self.end_time = None
@@ -57,24 +146,229 @@ class FileCollector:
                 return category
         return None
 
-    def _move_file(self, src: str, category: str, filename: str):
+    def _next_destination(self, category: str, filename: str) -> str:
         dest_folder = os.path.join(self.dest_path, category)
         os.makedirs(dest_folder, exist_ok=True)
 
         dst = os.path.join(dest_folder, filename)
         base, ext = os.path.splitext(filename)
         counter = 1
-        while os.path.exists(dst):
+        # Con copias en paralelo un destino puede estar elegido y aún no existir
+        while os.path.exists(dst) or dst in self._reserved:
             dst = os.path.join(dest_folder, f"{base}_{counter}{ext}")
             counter += 1
+        return dst
+
+    def _move_file(
+        self, src: str, category: str, filename: str, file_hash: Optional[str] = None
+    ):
+        if self.packer is not None:
+            # Se empaqueta al final del recorrido, en paralelo por volumen
+            arcname = os.path.relpath(src, self.source_path)
+            self._pack_queue.setdefault(category, []).append((src, arcname))
+            return
+
+        dst = self._next_destination(category, filename)
+        if self._copy_pool is None:
+            self._finish_move(self._transfer(src, dst, category, file_hash))
+            return
+
+        self._reserved.add(dst)
+        if self.archive_index is not None:
+            self._pending_sizes.add(os.path.getsize(src))
+        future = self._copy_pool.submit(self._transfer, src, dst, category, file_hash)
+        self._pending_moves.append((filename, dst, future))
+        if len(self._pending_moves) >= 4 * self.io_scheduler.max_workers:
+            self._wait_moves()
+
+    def _transfer(
+        self, src: str, dst: str, category: str, file_hash: Optional[str]
+    ) -> tuple:
+        # Puede correr en un hilo del grupo de copias: solo hace la E/S
+        before_copy = None
+        if self.checkpoint is not None:
+            before_copy = lambda: self.checkpoint.record_plan(src, dst, category)
+        size = os.path.getsize(src) if self.verify else None
+        if self.io_scheduler is not None:
+            with self.io_scheduler.slot():
+                copied_hash = move_file(
+                    src,
+                    dst,
+                    self.io_scheduler,
+                    capture_hash=self.verify,
+                    before_copy=before_copy,
+                )
+        else:
+            copied_hash = move_file(
+                src, dst, capture_hash=self.verify, before_copy=before_copy
+            )
+        return src, dst, category, file_hash or copied_hash, size
+
+    def _finish_move(self, moved: tuple):
+        src, dst, category, file_hash, size = moved
+        if self.verify:
+            self.transfer_log[dst] = (size, file_hash)
+        self._record(self.moved_files, self.moved_counts, category, dst)
+
+        if self.checkpoint is not None:
+            self.checkpoint.record_move(src, dst, category)
+
+        if self.archive_index is not None:
+            self.archive_index.add(dst, file_hash)
+
+    def _wait_moves(self):
+        """Espera las copias en curso y las registra en el hilo principal."""
+        for filename, dst, future in self._pending_moves:
+            try:
+                self._finish_move(future.result())
+            except Exception as e:
+                self.errors.append(f"{filename}: {str(e)}")
+            self._reserved.discard(dst)
+        self._pending_moves = []
+        self._pending_sizes.clear()
+
+    def _link_file(self, src: str, archived: str, category: str, filename: str):
+        # Enlace duro al archivo ya archivado; si el sistema no lo permite
+        # (otro volumen, FAT, etc.) se usa un enlace simbólico.
+        dst = self._next_destination(category, filename)
+        try:
+            os.link(archived, dst)
+        except OSError:
+            os.symlink(archived, dst)
+        os.remove(src)
+        self._record(self.linked_files, self.linked_counts, category, dst, "enlace")
+
+    def _handle_file(self, full_path: str, category: str, filename: str):
+        if self.archive_index is None:
+            self._move_file(full_path, category, filename)
+            return
+
+        st = os.stat(full_path)
+        if st.st_size in self._pending_sizes:
+            # Una copia en curso puede tener el mismo contenido: se espera a
+            # que entre en el índice antes de buscar
+            self._wait_moves()
+        file_hash = None
+        if self.archive_index.has_size(st.st_size):
+            file_hash = self._file_hash(full_path, st)
+        archived, file_hash = self.archive_index.find(full_path, st.st_size, file_hash)
+        if archived is None:
+            self._move_file(full_path, category, filename, file_hash)
+        elif self.archived_action == "link":
+            self._link_file(full_path, archived, category, filename)
+        else:
+            self.skipped_count += 1
+            if self.result_store is not None:
+                self.result_store.add("skipped_already_archived", full_path)
+            else:
+                self.skipped_files.append(full_path)
+
+    def _record(
+        self,
+        files: dict,
+        counts: dict,
+        category: str,
+        path: str,
+        detail: Optional[str] = None,
+    ):
+        # Con almacén de resultados solo se guardan los contadores en memoria
+        counts[category] = counts.get(category, 0) + 1
+        if self.result_store is not None:
+            self.result_store.add(category, path, detail)
+        else:
+            files.setdefault(category, []).append(path)
+
+    def _file_hash(self, full_path: str, st: os.stat_result) -> str:
+        # Reutiliza el hash guardado en el checkpoint si el archivo no cambió
+        if self.checkpoint is None:
+            return compute_file_hash(full_path, scheduler=self.io_scheduler)
+
+        file_hash = self.checkpoint.cached_hash(full_path, st)
+        if file_hash is None:
+            file_hash = compute_file_hash(full_path, scheduler=self.io_scheduler)
+            self.checkpoint.record_hash(full_path, st, file_hash)
+        return file_hash
 
-        shutil.move(src, dst)
-        self.moved_files.setdefault(category, []).append(dst)
+    def _resume_from_checkpoint(self):
+        self.checkpoint = Checkpoint(self.checkpoint_path, "collect", self.source_path)
+        self.checkpoint.load()
+        self.checkpoint.recover_planned_moves()
+        for src, dst in self.checkpoint.conflicts:
+            self.errors.append(
+                f"{src}: changed after its interrupted copy to {dst}; both kept"
+            )
+        for _, dst, category in self.checkpoint.completed_moves():
+            self._record(self.moved_files, self.moved_counts, category, dst)
+
+    def _save_progress(self, root: str):
+        # En modo empaquetado nada se mueve hasta el final: marcar carpetas
+        # como terminadas haría que una reanudación se saltara archivos.
+        if self.checkpoint is None or self.packer is not None:
+            return
+        try:
+            self.checkpoint.record_dir(root, os.stat(root))
+        except OSError:
+            pass
+        # El índice del destino es un JSON completo: se guarda como mucho
+        # una vez por intervalo del checkpoint.
+        now = time.time()
+        if (
+            self.archive_index is not None
+            and now - self._index_saved_at >= self.checkpoint.interval
+        ):
+            self.checkpoint.flush()
+            self.archive_index.save()
+            self._index_saved_at = now
 
     def collect(self):
         self.start_time = time.time()
 
+        if self.checkpoint_path:
+            self._resume_from_checkpoint()
+
+        if self.archived_action:
+            self.archive_index = ArchiveIndex(
+                self.dest_path, io_scheduler=self.io_scheduler
+            )
+            self.archive_index.load()
+            self._index_saved_at = time.time()
+
+        if self.io_scheduler is not None and self.packer is None:
+            self._copy_pool = ThreadPoolExecutor(max_workers=self.io_scheduler.max_workers)
+        try:
+            self._walk_source()
+        finally:
+            if self._copy_pool is not None:
+                self._wait_moves()
+                self._copy_pool.shutdown()
+                self._copy_pool = None
+
+        if self.packer is not None:
+            self._pack_collected()
+
+        if self.archive_index is not None:
+            self.archive_index.save()
+
+        if self.checkpoint is not None:
+            self.checkpoint.finish()
+
+        if self.verify and self.transfer_log:
+            self.verifier = IntegrityVerifier(
+                self.transfer_log, io_scheduler=self.io_scheduler
+            )
+            self.verifier.verify()
+
+        self.end_time = time.time()
+
+    def _walk_source(self):
         for root, _, files in os.walk(self.source_path):
+            if self.checkpoint is not None:
+                try:
+                    if self.checkpoint.is_dir_done(root, os.stat(root)):
+                        continue
+                except OSError:
+                    continue
+
             for file in files:
                 if not self._is_valid_file(file):
                     continue
@@ -87,11 +381,21 @@ class FileCollector:
 
                 try:
                     full_path = os.path.join(root, file)
-                    self._move_file(full_path, category, file)
+                    self._handle_file(full_path, category, file)
                 except Exception as e:
                     self.errors.append(f"{file}: {str(e)}")
 
-        self.end_time = time.time()
+            # La carpeta solo cuenta como terminada cuando sus copias acabaron
+            self._wait_moves()
+            self._save_progress(root)
+
+    def _pack_collected(self):
+        for volume in self.packer.pack(self._pack_queue):
+            category = os.path.basename(os.path.dirname(volume["path"]))
+            for src in volume["packed"]:
+                self._record(self.moved_files, self.moved_counts, category, src)
+        self.errors.extend(self.packer.errors)
+        self._pack_queue = {}
 
     def _get_results(self) -> dict:
         return {
@@ -110,8 +414,15 @@ class FileCollector:
                 if self.start_time and self.end_time
                 else None
             ),
-            "total_files_moved": sum(len(v) for v in self.moved_files.values()),
-            "categories": list(self.moved_files.keys()),
+            "total_files_moved": sum(self.moved_counts.values()),
+            "categories": list(self.moved_counts.keys()),
             "files_by_category": self.moved_files,
+            "total_files_linked": sum(self.linked_counts.values()),
+            "linked_by_category": self.linked_files,
+            "total_files_skipped": self.skipped_count,
+            "skipped_already_archived": self.skipped_files,
             "errors": self.errors,
+            "io_stats": self.io_scheduler.stats() if self.io_scheduler else None,
+            "archive": self.packer._get_results() if self.packer else None,
+            "verification": self.verifier._get_results() if self.verifier else None,
         }
@@ -2,21 +2,49 @@ import os
 from typing import Literal, Optional
 from collections import defaultdict
 
+from core.dir_snapshot import DirSnapshot
+from core.file_index import FileIndex
+
 
 class FolderAnalyzer:
     """
     Analyzes a folder and provides detailed info about sizes, counts,
     and structure of files and subfolders.
+
+    With a snapshot file, each run stores the per-directory listings and
+    size aggregates (direct files and whole subtree). The next run only
+    re-lists directories whose mtime changed, rewrites only their rows,
+    takes totals from the stored aggregates and reports what was added,
+    removed or resized since the previous run.
     """
 
     def __init__(
-        self, path: str, order_by: Literal["asc", "desc"] = "desc", unit: str = "MB"
+        self,
+        path: str,
+        order_by: Literal["asc", "desc"] = "desc",
+        unit: str = "MB",
+        snapshot_path: Optional[str] = None,
+        verify_sizes: bool = False,
+        index_path: Optional[str] = None,
+        known_hashes: Optional[dict[str, str]] = None,
     ):
         """
         Args:
             path (str): Path to the folder to analyze.
             order_by (str): 'asc' for smallest to largest, 'desc' for largest to smallest.
             unit (str): Unit for display size: B, KB, MB, GB
+            snapshot_path (str): Optional snapshot database (SQLite, see
+                `DirSnapshot`) used for incremental reruns and diffs.
+            verify_sizes (bool): Also re-stat files in unchanged directories.
+                Appending to a file does not change its directory's mtime, so
+                in-place growth is only seen with this option.
+            index_path (str): Optional SQLite database to write every file
+                into, for later queries through `file_index`. An index
+                written for another folder is rebuilt. The index stays open
+                after `analyze` for those queries; call `close` when done.
+            known_hashes (dict): {file path: SHA-256} already computed in
+                this session (e.g. `DuplicateHandler.file_hashes()`), stored
+                in the index's hash column.
         """
         self.base_path = os.path.abspath(path)
         self.order = order_by
@@ -28,6 +56,19 @@ class FolderAnalyzer:
         self.file_data = []  # List of (file_path, size_in_bytes)
         self.folder_data = defaultdict(lambda: {"size": 0, "files": 0, "folders": 0})
 
+        self.snapshot_path = snapshot_path
+        self.verify_sizes = verify_sizes
+        self.snapshot = {}  # dir -> {"mtime", "subdirs", "size", "file_count", "tree_size", "tree_files"}
+        self.dir_snapshot = None
+        self._files_loaded = True
+        self.diff = None
+        self.dirs_listed = 0
+
+        self.index_path = index_path
+        self.known_hashes = known_hashes
+        self.file_index = None
+        self._rebuilding_index = False
+
     def _get_size(self, path: str) -> int:
         """Returns file size in bytes."""
         try:
@@ -44,7 +85,16 @@ class FolderAnalyzer:
 
             for file in files:
                 full_path = os.path.join(root, file)
-                size = self._get_size(full_path)
+                if self.file_index is not None:
+                    try:
+                        st = os.stat(full_path)
+                    except OSError:
+                        st = None
+                    size = st.st_size if st else 0
+                    if st:
+                        self.file_index.add(full_path, st)
+                else:
+                    size = self._get_size(full_path)
                 total_size += size
                 self.file_data.append((full_path, size))
                 file_count += 1
@@ -53,12 +103,250 @@ class FolderAnalyzer:
             self.folder_data[root]["files"] = file_count
             self.folder_data[root]["folders"] = folder_count
 
+    def _list_dir(self, path: str, mtime: int) -> dict:
+        """Read one directory listing with file sizes."""
+        files = {}
+        subdirs = []
+        stats = []
+        try:
+            with os.scandir(path) as it:
+                for item in it:
+                    try:
+                        if item.is_dir(follow_symlinks=False):
+                            subdirs.append(item.name)
+                        elif item.is_file():
+                            st = item.stat()
+                            files[item.name] = [st.st_size, st.st_mtime_ns]
+                            stats.append((item.path, st))
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        self.dirs_listed += 1
+        self._index_listing(path, stats)
+        return self._entry(mtime, subdirs, files)
+
+    @staticmethod
+    def _entry(mtime: int, subdirs: list, files: dict) -> dict:
+        return {
+            "mtime": mtime,
+            "subdirs": subdirs,
+            "files": files,
+            "size": sum(size for size, _ in files.values()),
+            "file_count": len(files),
+        }
+
+    def _index_listing(self, path: str, stats: list):
+        if self.file_index is None:
+            return
+        if self._rebuilding_index:
+            for full_path, st in stats:
+                self.file_index.add(full_path, st)
+        else:
+            self.file_index.replace_dir(path, stats)
+
+    def _restat_files(self, path: str, entry: dict) -> dict:
+        """Re-stat the files of an unchanged directory; return `entry` if none changed."""
+        old_files = self.dir_snapshot.listing(path)
+        files = {}
+        stats = []
+        for name in old_files:
+            full_path = os.path.join(path, name)
+            try:
+                st = os.stat(full_path)
+            except OSError:
+                continue
+            files[name] = [st.st_size, st.st_mtime_ns]
+            stats.append((full_path, st))
+        if files == old_files:
+            return entry
+        self._index_listing(path, stats)
+        return self._entry(entry["mtime"], entry["subdirs"], files)
+
+    def _old_subtree(self, old: dict, path: str):
+        """Yield (dir, entry) for a directory of the old snapshot and its children."""
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            entry = old.get(current)
+            if entry is None:
+                continue
+            yield current, entry
+            stack.extend(os.path.join(current, d) for d in entry["subdirs"])
+
+    def _scan_incremental(self):
+        """
+        Walk the tree reusing the previous snapshot for unchanged directories,
+        and build the diff from the directories that did change.
+        """
+        old = self.dir_snapshot.load()
+        if self.file_index is not None and (
+            not old or self.file_index.is_empty() or not self.file_index.matches_base()
+        ):
+            # The index must be complete and belong to this folder:
+            # without a matching old state, list everything
+            old = {}
+            self._rebuilding_index = True
+            self.file_index.begin_rebuild()
+
+        diff = {
+            "added_files": [],
+            "removed_files": [],
+            "grown_files": [],
+            "shrunk_files": [],
+            "added_folders": [],
+            "removed_folders": [],
+            "grown_folders": [],
+            "bytes_delta": 0,
+        }
+
+        stack = [self.base_path]
+        while stack:
+            path = stack.pop()
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+
+            previous = old.get(path)
+            if previous is None:
+                entry = self._list_dir(path, mtime)
+                if old:
+                    diff["added_folders"].append(path)
+            elif previous["mtime"] != mtime:
+                entry = self._list_dir(path, mtime)
+            elif self.verify_sizes:
+                entry = self._restat_files(path, previous)
+            else:
+                entry = previous
+
+            if entry is not previous:
+                if old:
+                    self._diff_dir(path, previous, entry, old, diff)
+                self.dir_snapshot.put(path, entry)
+
+            self.snapshot[path] = entry
+            stack.extend(os.path.join(path, d) for d in entry["subdirs"])
+
+        self._update_tree_totals(old, diff)
+        self.dir_snapshot.commit()
+        self._files_loaded = False
+
+        if old:
+            self.diff = diff
+
+    def _update_tree_totals(self, old: dict, diff: dict):
+        """
+        Recompute subtree totals bottom-up from the per-directory aggregates
+        and queue the ones that changed. Folders whose subtree grew go to
+        the diff.
+        """
+        for path in sorted(self.snapshot, key=lambda p: p.count(os.sep), reverse=True):
+            entry = self.snapshot[path]
+            tree_size, tree_files = entry["size"], entry["file_count"]
+            for name in entry["subdirs"]:
+                child = self.snapshot.get(os.path.join(path, name))
+                if child is not None:
+                    tree_size += child["tree_size"]
+                    tree_files += child["tree_files"]
+
+            previous = old.get(path)
+            if previous is not None and tree_size > previous["tree_size"]:
+                diff["grown_folders"].append((path, tree_size - previous["tree_size"]))
+            if entry.get("tree_size") != tree_size or entry.get("tree_files") != tree_files:
+                if entry is previous:
+                    entry = self.snapshot[path] = dict(previous)
+                entry["tree_size"] = tree_size
+                entry["tree_files"] = tree_files
+                self.dir_snapshot.set_totals(path, tree_size, tree_files)
+
+    def _diff_dir(self, path: str, previous, entry: dict, old: dict, diff: dict):
+        old_files = self.dir_snapshot.listing(path) if previous else {}
+
+        for name, (size, _) in entry["files"].items():
+            full_path = os.path.join(path, name)
+            if name not in old_files:
+                diff["added_files"].append((full_path, size))
+                diff["bytes_delta"] += size
+            elif size != old_files[name][0]:
+                delta = size - old_files[name][0]
+                key = "grown_files" if delta > 0 else "shrunk_files"
+                diff[key].append((full_path, delta))
+                diff["bytes_delta"] += delta
+
+        for name, (size, _) in old_files.items():
+            if name not in entry["files"]:
+                diff["removed_files"].append((os.path.join(path, name), size))
+                diff["bytes_delta"] -= size
+
+        if previous:
+            for name in set(previous["subdirs"]) - set(entry["subdirs"]):
+                for removed, _ in self._old_subtree(old, os.path.join(path, name)):
+                    diff["removed_folders"].append(removed)
+                    self.dir_snapshot.delete(removed)
+                    if self.file_index is not None:
+                        self.file_index.remove_dir(removed)
+                    for file_name, (size, _) in self.dir_snapshot.listing(removed).items():
+                        diff["removed_files"].append(
+                            (os.path.join(removed, file_name), size)
+                        )
+                        diff["bytes_delta"] -= size
+
+    def _fill_from_snapshot(self):
+        """Per-folder data from the stored aggregates; no file is re-expanded."""
+        for path, entry in self.snapshot.items():
+            self.folder_data[path]["size"] = entry["size"]
+            self.folder_data[path]["files"] = entry["file_count"]
+            self.folder_data[path]["folders"] = len(entry["subdirs"])
+            self.folder_data[path]["tree_size"] = entry["tree_size"]
+            self.folder_data[path]["tree_files"] = entry["tree_files"]
+
+    def _load_file_data(self):
+        """Read every file of the snapshot, only when per-file results are asked for."""
+        if self._files_loaded:
+            return
+        dir_snapshot = DirSnapshot(self.snapshot_path, self.base_path)
+        try:
+            for path, files in dir_snapshot.iter_listings():
+                if path in self.snapshot:
+                    for name, (size, _) in files.items():
+                        self.file_data.append((os.path.join(path, name), size))
+        finally:
+            dir_snapshot.close()
+        self._files_loaded = True
+
     def _convert_size(self, size_bytes: int) -> float:
         return round(size_bytes / self.unit_divisor, 2)
 
     def analyze(self):
         """Run the folder scan."""
-        self._scan()
+        if self.index_path:
+            self.file_index = FileIndex(self.index_path, self.base_path)
+
+        if not self.snapshot_path:
+            if self.file_index is not None:
+                self.file_index.begin_rebuild()
+            self._scan()
+        else:
+            self.dir_snapshot = DirSnapshot(self.snapshot_path, self.base_path)
+            try:
+                self._scan_incremental()
+            finally:
+                self.dir_snapshot.close()
+                self.dir_snapshot = None
+            self._fill_from_snapshot()
+
+        if self.file_index is not None:
+            self.file_index.finish()
+            self._rebuilding_index = False
+            if self.known_hashes:
+                self.file_index.set_hashes(self.known_hashes)
+
+    def close(self):
+        """Close the file index (and its WAL connection), if one was opened."""
+        if self.file_index is not None:
+            self.file_index.close()
+            self.file_index = None
 
     def _get_results(self) -> dict:
         """
@@ -67,10 +355,13 @@ class FolderAnalyzer:
         Returns:
             dict: includes:
                 - top_files (list of tuples): [(file, size)]
-                - folders_info (dict): {folder: {size, files, folders}}
+                - folders_info (dict): {folder: {size, files, subfolders}},
+                  plus tree_size and tree_files (whole subtree) with a snapshot
                 - total_files (int)
                 - total_size (float, in selected unit)
+                - diff (dict | None): changes since the previous snapshot
         """
+        self._load_file_data()
         sorted_files = sorted(
             self.file_data, key=lambda x: x[1], reverse=self.order == "desc"
         )
@@ -78,17 +369,21 @@ class FolderAnalyzer:
             (path, self._convert_size(size)) for path, size in sorted_files
         ]
 
-        folder_summary = {
-            folder: {
+        folder_summary = {}
+        for folder, data in self.folder_data.items():
+            folder_summary[folder] = {
                 "size": self._convert_size(data["size"]),
                 "files": data["files"],
                 "subfolders": data["folders"],
             }
-            for folder, data in self.folder_data.items()
-        }
+            if "tree_size" in data:
+                folder_summary[folder]["tree_size"] = self._convert_size(
+                    data["tree_size"]
+                )
+                folder_summary[folder]["tree_files"] = data["tree_files"]
 
-        total_size = sum(size for _, size in self.file_data)
-        total_files = len(self.file_data)
+        total_size = sum(data["size"] for data in self.folder_data.values())
+        total_files = sum(data["files"] for data in self.folder_data.values())
 
         return {
             "unit": self.unit,
@@ -96,4 +391,32 @@ class FolderAnalyzer:
             "total_files": total_files,
             "top_files": converted_files,
             "folders_info": folder_summary,
+            "diff": self._get_diff(),
+        }
+
+    def _get_diff(self) -> dict | None:
+        """
+        Return the changes since the previous snapshot, or None on a first run.
+
+        Returns:
+            dict | None: added/removed/grown/shrunk files as (path, size in
+                unit), added/removed/grown folders, bytes delta in unit and
+                the number of directories that had to be re-listed.
+        """
+        if self.diff is None:
+            return None
+
+        def converted(items):
+            return [(path, self._convert_size(size)) for path, size in items]
+
+        return {
+            "added_files": converted(self.diff["added_files"]),
+            "removed_files": converted(self.diff["removed_files"]),
+            "grown_files": converted(self.diff["grown_files"]),
+            "shrunk_files": converted(self.diff["shrunk_files"]),
+            "added_folders": self.diff["added_folders"],
+            "removed_folders": self.diff["removed_folders"],
+            "grown_folders": converted(self.diff["grown_folders"]),
+            "size_delta": self._convert_size(self.diff["bytes_delta"]),
+            "dirs_listed": self.dirs_listed,
         }
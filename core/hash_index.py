@@ -0,0 +1,306 @@
+import os
+import hashlib
+import heapq
+import struct
+import time
+from multiprocessing import Pool
+from typing import Iterator, Optional
+
+from core.hashing import compute_file_hash
+
+
+INDEX_MAGIC = b"ARCHIDX1"
+INDEX_SUFFIX = ".idx"
+
+# digest (32 bytes) + size (uint64) + relative path length (uint16)
+_RECORD_HEADER = struct.Struct(">32sQH")
+_ROOT_HEADER = struct.Struct(">H")
+
+
+def index_name_for_root(root: str) -> str:
+    """
+    Return a stable index file name for a root folder.
+
+    Args:
+        root (str): Path of the scanned root.
+
+    Returns:
+        str: File name such as '<folder>-<short hash>.idx'.
+    """
+    root = os.path.abspath(root)
+    tag = hashlib.sha1(os.fsencode(root)).hexdigest()[:12]
+    label = os.path.basename(root.rstrip(os.sep)) or "root"
+    return f"{label}-{tag}{INDEX_SUFFIX}"
+
+
+def build_root_index(
+    root: str, index_path: str, skip_dirs: tuple = ()
+) -> tuple[str, int, list[str]]:
+    """
+    Hash every file below a root and write a sorted index file.
+
+    Meant to run inside a worker process: it only touches one root and
+    writes its result atomically, so a killed worker never leaves a
+    half-written index behind.
+
+    Args:
+        root (str): Folder to scan.
+        index_path (str): Destination path of the index file.
+        skip_dirs (tuple): Absolute folder paths that must not be scanned.
+
+    Returns:
+        tuple: (root, number of indexed files, list of errors).
+    """
+    root = os.path.abspath(root)
+    records = []
+    errors = []
+
+    for dirpath, dirs, files in os.walk(root):
+        dirs[:] = [
+            d for d in dirs if os.path.join(dirpath, d) not in skip_dirs
+        ]
+        for filename in files:
+            full_path = os.path.join(dirpath, filename)
+            try:
+                size = os.path.getsize(full_path)
+                digest = bytes.fromhex(compute_file_hash(full_path))
+            except OSError as e:
+                errors.append(f"{full_path}: {e}")
+                continue
+            rel_path = os.fsencode(os.path.relpath(full_path, root))
+            records.append((digest, size, rel_path))
+
+    records.sort()
+
+    root_bytes = os.fsencode(root)
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(INDEX_MAGIC)
+        f.write(_ROOT_HEADER.pack(len(root_bytes)))
+        f.write(root_bytes)
+        for digest, size, rel_path in records:
+            f.write(_RECORD_HEADER.pack(digest, size, len(rel_path)))
+            f.write(rel_path)
+    os.replace(tmp_path, index_path)
+
+    return root, len(records), errors
+
+
+def _build_root_index_task(args: tuple) -> tuple[str, int, list[str]]:
+    return build_root_index(*args)
+
+
+def read_index(index_path: str) -> Iterator[tuple[bytes, int, str]]:
+    """
+    Stream the records of an index file in sorted order.
+
+    Args:
+        index_path (str): Path of the index file.
+
+    Yields:
+        tuple: (digest, size, absolute file path).
+
+    Raises:
+        ValueError: If the file is not an index file.
+    """
+    with open(index_path, "rb") as f:
+        if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+            raise ValueError(f"{index_path} is not a hash index file")
+        (root_len,) = _ROOT_HEADER.unpack(f.read(_ROOT_HEADER.size))
+        root = os.fsdecode(f.read(root_len))
+
+        while header := f.read(_RECORD_HEADER.size):
+            digest, size, path_len = _RECORD_HEADER.unpack(header)
+            rel_path = os.fsdecode(f.read(path_len))
+            yield digest, size, os.path.join(root, rel_path)
+
+
+def read_index_root(index_path: str) -> str:
+    """Return the root folder recorded in an index file header."""
+    with open(index_path, "rb") as f:
+        if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+            raise ValueError(f"{index_path} is not a hash index file")
+        (root_len,) = _ROOT_HEADER.unpack(f.read(_ROOT_HEADER.size))
+        return os.fsdecode(f.read(root_len))
+
+
+class ShardedDuplicateScanner:
+    """
+    Finds duplicate files across many root folders (e.g. several volumes).
+
+    Each root is scanned by its own worker process, which writes a compact
+    index file sorted by content hash. Duplicates are then found by a
+    streaming k-way merge of those index files, so no file is read twice.
+    Index files are kept in `index_dir`: adding a new volume only scans
+    that volume, and the merge picks up every index already present.
+    """
+
+    def __init__(
+        self,
+        roots: list[str],
+        index_dir: str,
+        workers: Optional[int] = None,
+        debug: bool = False,
+    ):
+        """
+        Args:
+            roots (list[str]): Root folders to scan.
+            index_dir (str): Folder where index files are stored.
+            workers (int): Number of worker processes. Defaults to
+                min(len(roots), CPU count); use one worker per physical disk
+                when roots share spindles.
+            debug (bool): Whether to print logs during execution.
+        """
+        self.roots = [os.path.abspath(r) for r in roots]
+        self.index_dir = os.path.abspath(index_dir)
+        os.makedirs(self.index_dir, exist_ok=True)
+        self.workers = workers or max(1, min(len(self.roots), os.cpu_count() or 1))
+        self.debug = debug
+
+        self.indexed = {}
+        self.duplicate_groups = []
+        self.errors = []
+        self.start_time = None
+        self.end_time = None
+
+    def _log(self, message: str) -> None:
+        if self.debug:
+            print(message)
+
+    def _index_path(self, root: str) -> str:
+        return os.path.join(self.index_dir, index_name_for_root(root))
+
+    def build_indexes(self, rescan: bool = False) -> None:
+        """
+        Scan the roots that have no index yet (or all of them with `rescan`).
+
+        Args:
+            rescan (bool): Rebuild indexes that already exist.
+        """
+        skip_dirs = (self.index_dir,) + tuple(
+            os.path.join(root, "duplicates") for root in self.roots
+        )
+        pending = [
+            (root, self._index_path(root), skip_dirs)
+            for root in self.roots
+            if rescan or not os.path.exists(self._index_path(root))
+        ]
+        if not pending:
+            self._log("[Index] All roots already indexed")
+            return
+
+        workers = min(self.workers, len(pending))
+        with Pool(processes=workers) as pool:
+            for root, count, errors in pool.imap_unordered(
+                _build_root_index_task, pending
+            ):
+                self._log(f"[Index] {root}: {count} files")
+                self.indexed[root] = count
+                self.errors.extend(errors)
+
+    def index_files(self) -> list[str]:
+        """Return every index file currently stored in `index_dir`."""
+        return sorted(
+            os.path.join(self.index_dir, name)
+            for name in os.listdir(self.index_dir)
+            if name.endswith(INDEX_SUFFIX)
+        )
+
+    @staticmethod
+    def _tagged_records(index_path: str) -> Iterator[tuple[bytes, int, str, str]]:
+        root = read_index_root(index_path)
+        for digest, size, path in read_index(index_path):
+            yield digest, size, path, root
+
+    def merge(self, cross_root_only: bool = True) -> list[dict]:
+        """
+        Merge all stored indexes and collect groups of identical files.
+
+        Args:
+            cross_root_only (bool): Only report groups spanning two or more
+                roots. Duplicates inside one root are left to DuplicateHandler.
+
+        Returns:
+            list[dict]: One entry per group with hash, size and paths.
+        """
+        streams = [self._tagged_records(path) for path in self.index_files()]
+
+        groups = []
+        current_digest = None
+        current_size = 0
+        current = []
+
+        def flush():
+            roots = {root for _, root in current}
+            if len(current) > 1 and (not cross_root_only or len(roots) > 1):
+                groups.append(
+                    {
+                        "hash": current_digest.hex(),
+                        "size": current_size,
+                        "roots": sorted(roots),
+                        "paths": [path for path, _ in current],
+                    }
+                )
+
+        for digest, size, path, root in heapq.merge(*streams):
+            if digest != current_digest:
+                if current:
+                    flush()
+                current_digest, current_size, current = digest, size, []
+            current.append((path, root))
+        if current:
+            flush()
+
+        self.duplicate_groups = groups
+        return groups
+
+    def scan(self, rescan: bool = False, cross_root_only: bool = True) -> None:
+        """
+        Build missing indexes in parallel, then merge them.
+
+        Args:
+            rescan (bool): Rebuild indexes that already exist.
+            cross_root_only (bool): See `merge`.
+        """
+        self.start_time = time.time()
+        self.build_indexes(rescan=rescan)
+        self.merge(cross_root_only=cross_root_only)
+        self.end_time = time.time()
+
+    def _get_results(self) -> dict:
+        """
+        Return a dictionary with summary of the operation.
+
+        Returns:
+            dict: Contains:
+                - total_time (float): Time in seconds.
+                - indexed_roots (dict): Files indexed per root in this run.
+                - index_files (int): Number of indexes merged.
+                - duplicate_groups (int): Number of groups found.
+                - duplicate_files (int): Redundant copies (group size - 1).
+                - wasted_bytes (int): Bytes taken by redundant copies.
+                - duplicates_list (list): Redundant copy paths.
+                - errors (list): Files that could not be read.
+        """
+        total_time = (
+            (self.end_time - self.start_time)
+            if self.start_time and self.end_time
+            else None
+        )
+
+        return {
+            "total_time": total_time,
+            "indexed_roots": self.indexed.copy(),
+            "index_files": len(self.index_files()),
+            "duplicate_groups": len(self.duplicate_groups),
+            "duplicate_files": sum(
+                len(g["paths"]) - 1 for g in self.duplicate_groups
+            ),
+            "wasted_bytes": sum(
+                g["size"] * (len(g["paths"]) - 1) for g in self.duplicate_groups
+            ),
+            "duplicates_list": [
+                path for g in self.duplicate_groups for path in g["paths"][1:]
+            ],
+            "errors": self.errors.copy(),
+        }
@@ -0,0 +1,33 @@
+import hashlib
+from typing import Optional
+
+from core.io_scheduler import IOScheduler
+
+
+def compute_file_hash(
+    file_path: str, block_size: int = 65536, scheduler: Optional[IOScheduler] = None
+) -> str:
+    """
+    Compute the SHA-256 hash of a file, reading it in blocks.
+
+    Args:
+        file_path (str): Full path to the file.
+        block_size (int): Block size to read the file in bytes.
+        scheduler (IOScheduler): Optional scheduler that rate-limits the reads.
+
+    Returns:
+        str: The hash as hex string.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    hasher = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        if scheduler is None:
+            while chunk := f.read(block_size):
+                hasher.update(chunk)
+        else:
+            scheduler.throttle_file()
+            for chunk in scheduler.read_blocks(f, block_size):
+                hasher.update(chunk)
+    return hasher.hexdigest()
@@ -0,0 +1,278 @@
+import sys
+import time
+import ctypes
+import platform
+import threading
+from contextlib import contextmanager
+from typing import BinaryIO, Callable, Iterator, Optional
+
+
+# ioprio_set syscall numbers per architecture (Linux only)
+_IOPRIO_SYSCALLS = {
+    "x86_64": 251,
+    "amd64": 251,
+    "i386": 289,
+    "i686": 289,
+    "aarch64": 30,
+    "arm64": 30,
+    "armv7l": 314,
+    "ppc64le": 273,
+}
+_IOPRIO_WHO_PROCESS = 1
+_IOPRIO_CLASS_IDLE = 3
+_IOPRIO_CLASS_SHIFT = 13
+
+
+def set_idle_io_priority() -> bool:
+    """
+    Put the current process in the Linux 'idle' I/O scheduling class.
+
+    With the idle class the kernel only serves our reads and writes when no
+    other process needs the disk. Has no effect on other platforms.
+
+    Returns:
+        bool: True if the priority was applied.
+    """
+    if not sys.platform.startswith("linux"):
+        return False
+    syscall_nr = _IOPRIO_SYSCALLS.get(platform.machine().lower())
+    if syscall_nr is None:
+        return False
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        result = libc.syscall(
+            syscall_nr,
+            _IOPRIO_WHO_PROCESS,
+            0,
+            _IOPRIO_CLASS_IDLE << _IOPRIO_CLASS_SHIFT,
+        )
+    except (OSError, AttributeError):
+        return False
+    return result == 0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. `consume` blocks until enough tokens are
+    available; a rate of None means unlimited.
+    """
+
+    def __init__(self, rate: Optional[float], burst: Optional[float] = None):
+        """
+        Args:
+            rate (float): Tokens added per second, or None for no limit.
+            burst (float): Bucket capacity. Defaults to one second of rate.
+        """
+        self.rate = rate
+        self.capacity = burst if burst is not None else (rate or 0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, amount: float) -> None:
+        if not self.rate:
+            return
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            # Requests larger than the bucket are allowed to go into debt,
+            # which still keeps the long-term average at `rate`.
+            self.tokens -= amount
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class IOScheduler:
+    """
+    Shared I/O scheduler for the hashing and copy paths.
+
+    Limits throughput with bytes/s and files/s token buckets, and in
+    adaptive mode raises or lowers the number of concurrent workers based on
+    the observed read latency: when reads get slower than `target_latency`
+    other users are waiting on the disk, so concurrency goes down.
+    """
+
+    def __init__(
+        self,
+        bytes_per_sec: Optional[float] = None,
+        files_per_sec: Optional[float] = None,
+        adaptive: bool = False,
+        min_workers: int = 1,
+        max_workers: int = 4,
+        target_latency: float = 0.02,
+        idle_priority: bool = False,
+        reporter: Optional[Callable[[str], None]] = None,
+        report_interval: float = 2.0,
+    ):
+        """
+        Args:
+            bytes_per_sec (float): Budget of bytes read per second (a copy
+                reads each byte once, so this also bounds write volume).
+            files_per_sec (float): Budget of files opened per second.
+            adaptive (bool): Tune concurrency from observed read latency.
+            min_workers (int): Lower bound for adaptive concurrency.
+            max_workers (int): Upper bound (and the fixed value when not adaptive).
+            target_latency (float): Acceptable seconds per block read.
+            idle_priority (bool): Apply the Linux idle I/O class to this process.
+            reporter (callable): Receives a status line every `report_interval`.
+            report_interval (float): Seconds between status lines.
+        """
+        self.byte_bucket = TokenBucket(bytes_per_sec)
+        self.file_bucket = TokenBucket(files_per_sec, burst=files_per_sec)
+        self.adaptive = adaptive
+        self.min_workers = max(1, min_workers)
+        self.max_workers = max(self.min_workers, max_workers)
+        self.concurrency = self.min_workers if adaptive else self.max_workers
+        self.target_latency = target_latency
+        self.reporter = reporter
+        self.report_interval = report_interval
+
+        self.idle_priority = set_idle_io_priority() if idle_priority else False
+
+        self._lock = threading.Lock()
+        self._slots = threading.Condition(self._lock)
+        self._active = 0
+
+        self.latency = None  # EWMA of seconds per block read
+        self.total_bytes = 0
+        self.total_files = 0
+        self.start_time = time.monotonic()
+        self._window_start = self.start_time
+        self._window_bytes = 0
+        self._window_files = 0
+        self._rate = 0.0
+        self._file_rate = 0.0
+        self._last_adjust = self.start_time
+        self._last_report = self.start_time
+
+    @classmethod
+    def from_config(cls, config: dict, **kwargs) -> "IOScheduler":
+        """
+        Build a scheduler from a profile of config/io_config.json.
+
+        Args:
+            config (dict): Profile with optional keys 'mb_per_sec',
+                'files_per_sec', 'adaptive', 'min_workers', 'max_workers',
+                'target_latency_ms' and 'idle_priority'.
+            **kwargs: Extra constructor arguments (e.g. reporter).
+        """
+        mb_per_sec = config.get("mb_per_sec")
+        latency_ms = config.get("target_latency_ms", 20)
+        return cls(
+            bytes_per_sec=mb_per_sec * 1024**2 if mb_per_sec else None,
+            files_per_sec=config.get("files_per_sec"),
+            adaptive=config.get("adaptive", False),
+            min_workers=config.get("min_workers", 1),
+            max_workers=config.get("max_workers", 4),
+            target_latency=latency_ms / 1000,
+            idle_priority=config.get("idle_priority", False),
+            **kwargs,
+        )
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the `concurrency` worker slots while doing I/O."""
+        with self._slots:
+            while self._active >= self.concurrency:
+                self._slots.wait()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._slots:
+                self._active -= 1
+                self._slots.notify()
+
+    def throttle_file(self) -> None:
+        """Account for (and wait on) one file open."""
+        self.file_bucket.consume(1)
+        with self._lock:
+            self.total_files += 1
+            self._window_files += 1
+
+    def read_blocks(self, f: BinaryIO, block_size: int = 65536) -> Iterator[bytes]:
+        """
+        Yield blocks from an open file, throttled and timed.
+
+        Args:
+            f (BinaryIO): File opened in binary mode.
+            block_size (int): Bytes per read.
+        """
+        while True:
+            started = time.monotonic()
+            chunk = f.read(block_size)
+            if not chunk:
+                return
+            self._record_read(len(chunk), time.monotonic() - started)
+            self.byte_bucket.consume(len(chunk))
+            yield chunk
+
+    def _record_read(self, nbytes: int, seconds: float) -> None:
+        report = None
+        with self._slots:
+            self.total_bytes += nbytes
+            self._window_bytes += nbytes
+            self.latency = (
+                seconds if self.latency is None else 0.8 * self.latency + 0.2 * seconds
+            )
+
+            now = time.monotonic()
+            elapsed = now - self._window_start
+            if elapsed >= 1.0:
+                self._rate = self._window_bytes / elapsed
+                self._file_rate = self._window_files / elapsed
+                self._window_start = now
+                self._window_bytes = 0
+                self._window_files = 0
+
+            if self.adaptive and now - self._last_adjust >= 1.0:
+                self._adjust()
+                self._last_adjust = now
+
+            if self.reporter and now - self._last_report >= self.report_interval:
+                self._last_report = now
+                report = self.describe()
+        if report:
+            self.reporter(report)
+
+    def _adjust(self) -> None:
+        # Additive increase while the disk answers fast, halve when it is slow
+        if self.latency > self.target_latency:
+            self.concurrency = max(self.min_workers, self.concurrency // 2)
+        elif self.latency < self.target_latency / 2:
+            self.concurrency = min(self.max_workers, self.concurrency + 1)
+            self._slots.notify_all()
+
+    def _current_rates(self) -> tuple[float, float]:
+        # Until the first one-second window closes, report the run average
+        if self._rate or self._file_rate:
+            return self._rate, self._file_rate
+        elapsed = max(time.monotonic() - self.start_time, 1e-6)
+        return self.total_bytes / elapsed, self.total_files / elapsed
+
+    def stats(self) -> dict:
+        """Return the current throughput, latency and concurrency."""
+        rate, file_rate = self._current_rates()
+        return {
+            "bytes_per_sec": round(rate),
+            "files_per_sec": round(file_rate, 1),
+            "latency_ms": round(self.latency * 1000, 2) if self.latency else None,
+            "concurrency": self.concurrency,
+            "total_bytes": self.total_bytes,
+            "total_files": self.total_files,
+            "idle_priority": self.idle_priority,
+        }
+
+    def describe(self) -> str:
+        """Return a one-line status for progress output."""
+        rate, file_rate = self._current_rates()
+        latency = f"{self.latency * 1000:.1f} ms" if self.latency else "-"
+        return (
+            f"[IO] {rate / 1024**2:.1f} MB/s, "
+            f"{file_rate:.0f} files/s, latency {latency}, "
+            f"workers {self.concurrency}/{self.max_workers}"
+        )
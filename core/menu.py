@@ -82,6 +82,15 @@ def ask_date_mode() -> str:
     return {"1": "full", "2": "day", "3": "month", "4": "year", "5": "range"}[choice]
 
 
+def ask_io_profile(io_config: dict) -> dict | None:
+    console.rule("[bold]Límite de uso de disco")
+    console.print("1. Sin límite")
+    console.print("2. Horario laboral (limitado, baja prioridad)")
+    console.print("3. Nocturno (máximo rendimiento)")
+    choice = Prompt.ask("\nSelecciona una opción", choices=["1", "2", "3"], default="1")
+    return {"1": None, "2": io_config.get("day"), "3": io_config.get("night")}[choice]
+
+
 def ask_path() -> str:
     return Prompt.ask("Introduce la ruta de la carpeta a archivar")
 
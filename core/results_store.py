@@ -0,0 +1,259 @@
+import os
+import sqlite3
+from collections import Counter
+from typing import Optional
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS summary (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS rows (
+    id INTEGER PRIMARY KEY,
+    category TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    name TEXT NOT NULL,
+    detail TEXT
+);
+CREATE TABLE IF NOT EXISTS folder_counts (
+    category TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    files INTEGER NOT NULL,
+    PRIMARY KEY (category, folder)
+);
+"""
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_rows_category ON rows (category, id);
+CREATE INDEX IF NOT EXISTS idx_rows_folder ON rows (folder, id);
+CREATE INDEX IF NOT EXISTS idx_rows_category_folder ON rows (category, folder, id);
+CREATE INDEX IF NOT EXISTS idx_folder_counts_files ON folder_counts (files);
+"""
+
+
+class ResultStore:
+    """
+    SQLite store for the rows of a run's results (moved files, duplicates...).
+
+    Handlers append rows with `add` while they run, so the results never
+    have to exist as one big dictionary. Indexes and per-folder counts are
+    kept up to date batch by batch; once the run ends, showing the summary
+    or any page is a handful of indexed queries (keyset pagination,
+    `id > last id`) whatever the number of rows.
+
+    Text is stored with undecodable bytes of file names (surrogate escapes)
+    shown as backslash escapes, so any path can be added and displayed.
+    """
+
+    # Lists of run metadata rather than of files: shown in the summary.
+    summary_lists = ("categories", "errors", "volumes", "failed")
+
+    def __init__(
+        self, db_path: str = ":memory:", base_path: str = "", batch_size: int = 50000
+    ):
+        """
+        Args:
+            db_path (str): Database file, or ':memory:' for a throwaway store.
+            base_path (str): Prefix stripped from paths when they are stored.
+            batch_size (int): Rows per insert transaction.
+        """
+        self.base_path = os.path.abspath(base_path) if base_path else ""
+        self.batch_size = batch_size
+        self._batch = []
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(_SCHEMA + _INDEXES)
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
+
+    @staticmethod
+    def _text(value: str) -> str:
+        raw = value.encode("utf-8", "surrogateescape")
+        return raw.decode("utf-8", "backslashreplace")
+
+    def _split(self, path: str) -> tuple[str, str]:
+        if self.base_path and (
+            path == self.base_path or path.startswith(self.base_path + os.sep)
+        ):
+            path = path[len(self.base_path):].lstrip(os.sep)
+        folder, name = os.path.split(path)
+        return folder or ".", name
+
+    @staticmethod
+    def _is_path(item) -> bool:
+        if isinstance(item, (list, tuple)) and item:
+            item = item[0]
+        elif isinstance(item, dict):
+            item = item.get("path")
+        return isinstance(item, str) and os.path.isabs(item)
+
+    def load_results(self, results: dict) -> None:
+        """
+        Flatten a `_get_results()` dictionary into the store.
+
+        Lists of paths become rows whose category is their key (paths
+        as-is, tuples as path + detail, dicts via their 'path'); dicts keyed
+        by paths become rows with the value as detail; other nested dicts
+        are walked with their own keys (e.g. files_by_category). Scalars,
+        `summary_lists` and lists of anything but paths (e.g. category
+        names, error messages) go to the summary. Rows already added with
+        `add` are kept.
+
+        Args:
+            results (dict): Output of any `_get_results()`.
+        """
+        summary = []
+        for key, value in results.items():
+            self._load_value(key, value, summary)
+        self.flush()
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO summary VALUES (?, ?)", summary
+            )
+
+    def _load_value(self, key: str, value, summary: list, prefix: str = "") -> None:
+        if isinstance(value, list) and (
+            key in self.summary_lists or not all(map(self._is_path, value))
+        ):
+            summary.append((prefix + key, self._text("\n".join(map(str, value)))))
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, str):
+                    self.add(key, item)
+                elif isinstance(item, (list, tuple)):
+                    detail = item[1] if len(item) == 2 else item[1:]
+                    self.add(key, item[0], str(detail))
+                else:
+                    detail = {k: v for k, v in item.items() if k != "path"}
+                    self.add(key, item["path"], str(detail))
+        elif isinstance(value, dict):
+            for inner_key, inner_value in value.items():
+                if os.sep in str(inner_key):
+                    self.add(key, str(inner_key), str(inner_value))
+                elif isinstance(inner_value, (list, dict)):
+                    self._load_value(inner_key, inner_value, summary, f"{key}.")
+                else:
+                    summary.append(
+                        (f"{key}.{inner_key}", self._text(str(inner_value)))
+                    )
+        else:
+            summary.append((key, self._text(str(value))))
+
+    def add(self, category: str, path: str, detail: Optional[str] = None) -> None:
+        """
+        Queue one row; rows are written in batches of `batch_size`.
+
+        Args:
+            category (str): Group of the row (e.g. a file category).
+            path (str): Full path of the file.
+            detail (str): Optional extra text shown with the row.
+        """
+        folder, name = self._split(path)
+        self._batch.append(
+            (
+                self._text(category),
+                self._text(folder),
+                self._text(name),
+                self._text(detail) if detail is not None else None,
+            )
+        )
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write queued rows and add them to the per-folder counts."""
+        if not self._batch:
+            return
+        counts = Counter((category, folder) for category, folder, _, _ in self._batch)
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO rows (category, folder, name, detail) VALUES (?, ?, ?, ?)",
+                self._batch,
+            )
+            self.conn.executemany(
+                "INSERT INTO folder_counts VALUES (?, ?, ?) "
+                "ON CONFLICT (category, folder) DO UPDATE "
+                "SET files = files + excluded.files",
+                [(category, folder, n) for (category, folder), n in counts.items()],
+            )
+        self._batch.clear()
+
+    def summary(self) -> list[tuple[str, str]]:
+        return self.conn.execute("SELECT key, value FROM summary").fetchall()
+
+    def categories(self) -> list[tuple[str, int]]:
+        """Return (category, rows) pairs."""
+        return self.conn.execute(
+            "SELECT category, SUM(files) FROM folder_counts "
+            "GROUP BY category ORDER BY SUM(files) DESC"
+        ).fetchall()
+
+    def folder_counts(self, category: Optional[str] = None, limit: int = 20) -> list[tuple]:
+        """
+        Return the folders with most rows.
+
+        Args:
+            category (str): Only count rows of this category.
+            limit (int): Number of folders.
+
+        Returns:
+            list: (folder, rows), largest first.
+        """
+        if category is None:
+            return self.conn.execute(
+                "SELECT folder, SUM(files) AS n FROM folder_counts "
+                "GROUP BY folder ORDER BY n DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return self.conn.execute(
+            "SELECT folder, files FROM folder_counts WHERE category = ? "
+            "ORDER BY files DESC LIMIT ?",
+            (category, limit),
+        ).fetchall()
+
+    def count(self, category: Optional[str] = None, folder: Optional[str] = None) -> int:
+        where, params = self._filters(category, folder)
+        row = self.conn.execute(
+            f"SELECT COALESCE(SUM(files), 0) FROM folder_counts{where}", params
+        ).fetchone()
+        return row[0]
+
+    @staticmethod
+    def _filters(category: Optional[str], folder: Optional[str]) -> tuple[str, tuple]:
+        clauses = []
+        params = []
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        if folder is not None:
+            clauses.append("folder = ?")
+            params.append(folder)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return where, tuple(params)
+
+    def page(
+        self,
+        after_id: int = 0,
+        limit: int = 50,
+        category: Optional[str] = None,
+        folder: Optional[str] = None,
+    ) -> list[tuple]:
+        """
+        Return the next page of rows after `after_id`.
+
+        Args:
+            after_id (int): Last id of the previous page (0 for the first).
+            limit (int): Rows per page.
+            category (str): Only rows of this category.
+            folder (str): Only rows directly inside this folder.
+
+        Returns:
+            list: (id, category, folder, name, detail).
+        """
+        where, params = self._filters(category, folder)
+        where = (where + " AND" if where else " WHERE") + " id > ?"
+        return self.conn.execute(
+            "SELECT id, category, folder, name, detail FROM rows"
+            f"{where} ORDER BY id LIMIT ?",
+            params + (after_id, limit),
+        ).fetchall()
@@ -0,0 +1,136 @@
+from typing import Optional
+
+from rich.console import Console
+from rich.prompt import Prompt
+from rich.table import Table
+
+from core.results_store import ResultStore
+
+
+class ResultsViewer:
+    """
+    Paginated terminal viewer for a ResultStore.
+
+    Shows the run summary and per-folder counts first, then the rows one
+    page at a time. Only the current page is read from the store and
+    rendered, so the first screen appears just as fast for ten rows as for
+    a million. Rows can be filtered by category or folder.
+    """
+
+    def __init__(
+        self,
+        store: ResultStore,
+        title: str,
+        page_size: int = 30,
+        console: Optional[Console] = None,
+    ):
+        """
+        Args:
+            store (ResultStore): Store with the results of the run.
+            title (str): Title shown above each table.
+            page_size (int): Rows per page.
+            console (Console): Rich console to print to.
+        """
+        self.store = store
+        self.title = title
+        self.page_size = page_size
+        self.console = console or Console()
+
+        self.category = None
+        self.folder = None
+        self._page_starts = [0]  # after_id of each visited page
+        self._last_id = 0
+
+    def _show_overview(self):
+        summary = self.store.summary()
+        if summary:
+            table = Table(title=self.title)
+            table.add_column("Dato", style="cyan")
+            table.add_column("Valor", style="magenta")
+            for key, value in summary:
+                table.add_row(key, value)
+            self.console.print(table)
+
+        categories = Table(title="Categorías")
+        categories.add_column("Categoría", style="cyan")
+        categories.add_column("Archivos", style="magenta", justify="right")
+        for category, files in self.store.categories():
+            categories.add_row(category, str(files))
+        self.console.print(categories)
+
+        folders = Table(title="Carpetas con más archivos")
+        folders.add_column("Carpeta", style="cyan")
+        folders.add_column("Archivos", style="magenta", justify="right")
+        for folder, files in self.store.folder_counts(self.category):
+            folders.add_row(folder, str(files))
+        self.console.print(folders)
+
+    def _show_page(self):
+        after_id = self._page_starts[-1]
+        rows = self.store.page(after_id, self.page_size, self.category, self.folder)
+
+        filters = []
+        if self.category:
+            filters.append(f"categoría={self.category}")
+        if self.folder:
+            filters.append(f"carpeta={self.folder}")
+        total = self.store.count(self.category, self.folder)
+        caption = f"Página {len(self._page_starts)} · {total} archivos"
+        if filters:
+            caption += " · " + ", ".join(filters)
+
+        table = Table(title=self.title, caption=caption)
+        table.add_column("Archivo", style="cyan", no_wrap=True)
+        table.add_column("Carpeta", style="green")
+        table.add_column("Detalles", style="magenta")
+        for _, category, folder, name, detail in rows:
+            table.add_row(name, folder, detail or category)
+        self.console.print(table)
+
+        self._last_id = rows[-1][0] if rows else after_id
+        return len(rows) == self.page_size
+
+    def _reset_pages(self):
+        self._page_starts = [0]
+        self._last_id = 0
+
+    def _ask_category(self):
+        choices = [category for category, _ in self.store.categories()]
+        self.console.print("Categorías: " + ", ".join(choices))
+        category = Prompt.ask("Categoría (vacío para todas)", default="")
+        self.category = category if category in choices else None
+        self._reset_pages()
+
+    def _ask_folder(self):
+        folder = Prompt.ask("Carpeta relativa (vacío para todas)", default="")
+        self.folder = folder or None
+        self._reset_pages()
+
+    def run(self):
+        """Show the overview and let the user page through the rows."""
+        self._show_overview()
+        has_more = self._show_page()
+        if not self.console.is_terminal:
+            return
+
+        while True:
+            choice = Prompt.ask(
+                "[n] siguiente · [p] anterior · [c] categoría · [f] carpeta · "
+                "[r] resumen · [q] salir",
+                choices=["n", "p", "c", "f", "r", "q"],
+                default="n" if has_more else "q",
+            )
+            if choice == "q":
+                return
+            if choice == "n" and has_more:
+                self._page_starts.append(self._last_id)
+            elif choice == "p" and len(self._page_starts) > 1:
+                self._page_starts.pop()
+            elif choice == "c":
+                self._ask_category()
+            elif choice == "f":
+                self._ask_folder()
+            elif choice == "r":
+                self._show_overview()
+                continue
+            has_more = self._show_page()
@@ -0,0 +1,85 @@
+import os
+import errno
+import shutil
+import hashlib
+from typing import Callable, Optional
+
+from core.io_scheduler import IOScheduler
+
+
+def move_file(
+    src: str,
+    dst: str,
+    scheduler: Optional[IOScheduler] = None,
+    capture_hash: bool = False,
+    block_size: int = 1024 * 1024,
+    before_copy: Optional[Callable[[], None]] = None,
+) -> Optional[str]:
+    """
+    Move a file, streaming the data through the I/O scheduler when it has
+    to be copied to another device.
+
+    A rename on the same device is tried first (no data is transferred).
+    Across devices the file is copied to `dst + ".part"`, synced, given the
+    source metadata and renamed to `dst`; only then is the source removed.
+    An interrupted copy therefore never leaves a truncated file under the
+    final name. The copy goes block by block under the scheduler's rate
+    limits, and with `capture_hash` the SHA-256 of the bytes read from the
+    source is computed during that same copy, so the data is read only once.
+
+    Args:
+        src (str): File to move.
+        dst (str): Destination file path.
+        scheduler (IOScheduler): Optional scheduler for rate limiting.
+        capture_hash (bool): Hash the source while copying it.
+        block_size (int): Bytes per read when copying.
+        before_copy (callable): Called once the move turns out to need a
+            copy, before anything is written (e.g. to record it in a
+            checkpoint).
+
+    Returns:
+        str | None: Source hash if the file was copied with `capture_hash`,
+            None when it was renamed or no hash was requested.
+    """
+    if scheduler is not None:
+        scheduler.throttle_file()
+    try:
+        os.rename(src, dst)
+        return None
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+
+    if before_copy is not None:
+        before_copy()
+
+    part_path = partial_path(dst)
+    hasher = hashlib.sha256() if capture_hash else None
+    try:
+        if scheduler is None and hasher is None:
+            shutil.copyfile(src, part_path)
+        else:
+            with open(src, "rb") as fsrc, open(part_path, "wb") as fdst:
+                if scheduler is not None:
+                    blocks = scheduler.read_blocks(fsrc, block_size)
+                else:
+                    blocks = iter(lambda: fsrc.read(block_size), b"")
+                for chunk in blocks:
+                    if hasher is not None:
+                        hasher.update(chunk)
+                    fdst.write(chunk)
+        with open(part_path, "rb+") as f:
+            os.fsync(f.fileno())
+        shutil.copystat(src, part_path)
+        os.replace(part_path, dst)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    os.remove(src)
+    return hasher.hexdigest() if hasher is not None else None
+
+
+def partial_path(dst: str) -> str:
+    """Name under which `move_file` writes `dst` until the copy is complete."""
+    return dst + ".part"
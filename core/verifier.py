@@ -0,0 +1,100 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from core.hashing import compute_file_hash
+from core.io_scheduler import IOScheduler
+
+
+class IntegrityVerifier:
+    """
+    Checks that moved files arrived intact.
+
+    Each destination is compared against what was captured during the move:
+    its size, and its source hash when one is known (hashed while copying, or
+    already computed by DuplicateHandler). Files are re-read by a thread
+    pool; hashlib releases the GIL, so threads overlap reads and hashing.
+    """
+
+    def __init__(
+        self,
+        expected: dict[str, tuple[int, Optional[str]]],
+        workers: int = 4,
+        io_scheduler: Optional[IOScheduler] = None,
+    ):
+        """
+        Args:
+            expected (dict): {destination path: (size, source hash or None)}.
+            workers (int): Number of verification threads. Ignored when an
+                io_scheduler is given: the pool then matches its max_workers
+                and each read holds one of its slots.
+            io_scheduler (IOScheduler): Optional scheduler for the reads.
+        """
+        self.expected = expected
+        self.workers = io_scheduler.max_workers if io_scheduler else workers
+        self.io_scheduler = io_scheduler
+
+        self.verified = []
+        self.failures = []
+        self.start_time = None
+        self.end_time = None
+
+    def _check(self, path: str) -> Optional[str]:
+        """Return the reason `path` fails verification, or None if it is intact."""
+        size, expected_hash = self.expected[path]
+        try:
+            actual_size = os.path.getsize(path)
+        except OSError:
+            return "missing"
+        if actual_size != size:
+            return f"size mismatch: expected {size}, found {actual_size}"
+        if expected_hash is None:
+            return None
+        try:
+            if self.io_scheduler is None:
+                actual_hash = compute_file_hash(path)
+            else:
+                with self.io_scheduler.slot():
+                    actual_hash = compute_file_hash(path, scheduler=self.io_scheduler)
+        except OSError as e:
+            return f"unreadable: {e}"
+        if actual_hash != expected_hash:
+            return "hash mismatch"
+        return None
+
+    def verify(self) -> None:
+        """Check every expected file in the worker pool."""
+        self.start_time = time.time()
+        paths = list(self.expected)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for path, reason in zip(paths, pool.map(self._check, paths)):
+                if reason is None:
+                    self.verified.append(path)
+                else:
+                    self.failures.append({"path": path, "reason": reason})
+        self.end_time = time.time()
+
+    def _get_results(self) -> dict:
+        """
+        Return a summary of the verification.
+
+        Returns:
+            dict: Contains:
+                - total_checked (int): Files checked.
+                - verified (int): Files that matched.
+                - hash_checked (int): Files compared by hash, not only size.
+                - failed (list): {path, reason} for each failing file.
+                - duration_seconds (float): Time spent verifying.
+        """
+        return {
+            "total_checked": len(self.expected),
+            "verified": len(self.verified),
+            "hash_checked": sum(1 for _, h in self.expected.values() if h),
+            "failed": self.failures.copy(),
+            "duration_seconds": (
+                round(self.end_time - self.start_time, 2)
+                if self.start_time and self.end_time
+                else None
+            ),
+        }
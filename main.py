@@ -2,6 +2,9 @@ from core.duplicates import DuplicateHandler
 from core.file_organizer import FileOrganizer
 from core.folder_analyzer import FolderAnalyzer
 from core.filecollector import FileCollector
+from core.io_scheduler import IOScheduler
+from core.results_store import ResultStore
+from core.results_viewer import ResultsViewer
 from core.menu import (
     show_ascii_title,
     show_main_menu,
@@ -12,37 +15,26 @@ from core.menu import (
     show_config_summary,
     simulate_progress,
     ask_dest_path,
+    ask_io_profile,
 )
 from configs import extension_config as default_ext_config
 from configs import rename_config as default_rename_config
 from configs import collector_exclude_config
 from configs import collector_config as default_collector_config
-from rich.console import Console
-from rich.table import Table
-import os
+from configs import io_config
 
 
-def display_results_table(path, results: dict, title: str):
-    console = Console()
-    table = Table(title=title)
-
-    table.add_column("Archivo", style="cyan", no_wrap=True)
-    table.add_column("Detalles", style="magenta")
-
-    for key, value in results.items():
-        if isinstance(value, list):
-            for item in value:
-                if isinstance(item, str):
-                    display_path = item.replace(path, "").lstrip(os.sep)
-                    table.add_row(display_path, key)
-        elif isinstance(value, dict):
-            for k, v in value.items():
-                display_path = k.replace(path, "").lstrip(os.sep)
-                table.add_row(display_path, str(v))
-        else:
-            table.add_row(str(key), str(value))
-
-    console.print(table)
+def display_results_table(path, results: dict, title: str, store=None):
+    # Los resultados se muestran por páginas desde un almacén SQLite. Si la
+    # ejecución ya escribió sus filas en `store`, aquí solo se añade el
+    # resumen y se lee la primera página.
+    if store is None:
+        store = ResultStore(base_path=path)
+    try:
+        store.load_results(results)
+        ResultsViewer(store, title).run()
+    finally:
+        store.close()
 
 
 def main():
@@ -82,16 +74,25 @@ def main():
     rename_config = ask_rename_config(default_rename_config)
     config_summary["Renombrado"] = rename_config
 
+    # Límite de uso de disco para duplicados y colecta
+    io_scheduler = None
+    if do_duplicates or do_collect:
+        io_profile = ask_io_profile(io_config)
+        config_summary["Límite de disco"] = io_profile or "Sin límite"
+        if io_profile:
+            io_scheduler = IOScheduler.from_config(io_profile, reporter=print)
+
     # Mostrar resumen
     show_config_summary(config_summary)
 
     # Ejecutar duplicados
     if do_duplicates:
         simulate_progress("Eliminando duplicados", seconds=2)
-        dh = DuplicateHandler(path)
+        dh_store = ResultStore(base_path=path)
+        dh = DuplicateHandler(path, io_scheduler=io_scheduler, result_store=dh_store)
         dh.scan_and_move_duplicates()
         dh_results = dh._get_results()
-        display_results_table(path, dh_results, "Archivos Duplicados")
+        display_results_table(path, dh_results, "Archivos Duplicados", dh_store)
 
     if do_collect:
         # Pedir configuración de extensiones (usar default o personalizada)
@@ -110,16 +111,21 @@ def main():
 
         simulate_progress("Recolectando y moviendo archivos", seconds=3)
 
+        collect_store = ResultStore(base_path=dest_path)
         collector = FileCollector(
             source_path=path,
             dest_path=dest_path,
             config=ext_config,
             excluded_config=ext_exclude_config,
+            io_scheduler=io_scheduler,
+            result_store=collect_store,
         )
         collector.collect()
         results = collector._get_results()
 
-        display_results_table(path, results, "Resultados de Colecta y Movimiento")
+        display_results_table(
+            path, results, "Resultados de Colecta y Movimiento", collect_store
+        )
 
     # Ejecutar organización por extensión/fecha
     if do_classify_ext or do_classify_date:
@@ -0,0 +1,50 @@
+import os
+
+from core.archive_index import ArchiveIndex
+
+
+def test_links_and_partial_files_are_not_indexed(tmp_path):
+    archive = tmp_path / "archive"
+    (archive / "Docs").mkdir(parents=True)
+    original = archive / "Docs" / "a.txt"
+    original.write_bytes(b"content")
+    os.symlink(original, archive / "Docs" / "link.txt")
+    (archive / "Docs" / "b.txt.part").write_bytes(b"partial")
+    (archive / "Docs" / "c.txt.tmp").write_bytes(b"partial")
+
+    index = ArchiveIndex(str(archive))
+    index.load()
+
+    assert list(index.entries) == [os.path.join("Docs", "a.txt")]
+
+
+def test_partial_copy_is_never_returned_as_archived(tmp_path):
+    archive = tmp_path / "archive"
+    archive.mkdir()
+    (archive / "b.txt.part").write_bytes(b"same")
+    candidate = tmp_path / "b.txt"
+    candidate.write_bytes(b"same")
+
+    index = ArchiveIndex(str(archive))
+    index.load()
+
+    assert index.find(str(candidate), 4) == (None, None)
+
+
+def test_reload_only_lists_changed_folders(tmp_path):
+    archive = tmp_path / "archive"
+    for folder in ("a", "b"):
+        (archive / folder).mkdir(parents=True)
+        (archive / folder / "f.txt").write_bytes(folder.encode())
+
+    index = ArchiveIndex(str(archive))
+    index.load()
+    index.save()
+    (archive / "b" / "g.txt").write_bytes(b"new")
+
+    index = ArchiveIndex(str(archive))
+    index.load()
+
+    assert index.dirs_listed <= 2  # 'b' and possibly the root
+    assert os.path.join("b", "g.txt") in index.entries
+    assert os.path.join("a", "f.txt") in index.entries
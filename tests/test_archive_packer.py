@@ -0,0 +1,61 @@
+import os
+import tarfile
+
+from core import archive_packer
+from core.archive_packer import ArchivePacker, pack_volume
+
+
+def _volume(tmp_path, names):
+    members = []
+    for name in names:
+        src = tmp_path / name
+        src.write_bytes(name.encode() * 1000)
+        members.append((str(src), name, src.stat().st_size))
+    return {
+        "path": str(tmp_path / "Docs_0001.tar.gz"),
+        "compression": "gz",
+        "level": 1,
+        "members": members,
+    }
+
+
+def test_member_error_aborts_the_whole_volume(tmp_path, monkeypatch):
+    volume = _volume(tmp_path, ["a.txt", "b.txt", "c.txt"])
+    copy = tarfile.copyfileobj
+
+    def failing_copy(src, dst, length=None, *args, **kwargs):
+        if src.name.endswith("b.txt"):
+            dst.write(b"x" * 10)  # Partial data already in the stream
+            raise OSError("unexpected end of data")
+        return copy(src, dst, length, *args, **kwargs)
+
+    monkeypatch.setattr(archive_packer.tarfile, "copyfileobj", failing_copy)
+    result = pack_volume(volume)
+
+    assert result["packed"] == []
+    assert len(result["errors"]) == 1 and "b.txt" in result["errors"][0]
+    assert not os.path.exists(volume["path"])
+    assert not os.path.exists(volume["path"] + ".part")
+
+
+def test_pack_writes_readable_volumes_and_removes_sources(tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    members = []
+    for name in ("a.txt", "b.txt", "photo.jpg"):
+        (source / name).write_bytes(name.encode() * 1000)
+        members.append((str(source / name), name))
+
+    packer = ArchivePacker(str(tmp_path / "dest"), compression="gz", workers=2)
+    packer.pack({"Docs": members})
+    results = packer._get_results()
+
+    assert results["total_files"] == 3 and results["errors"] == []
+    assert os.listdir(source) == []
+    names = set()
+    for path in results["volumes"]:
+        with tarfile.open(path) as tar:
+            for member in tar.getmembers():
+                names.add(member.name)
+                assert tar.extractfile(member).read() == member.name.encode() * 1000
+    assert names == {"a.txt", "b.txt", "photo.jpg"}
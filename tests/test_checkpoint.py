@@ -0,0 +1,83 @@
+import errno
+import os
+
+import pytest
+
+from core.checkpoint import Checkpoint
+from core.filecollector import FileCollector
+from core.transfer import partial_path
+
+
+@pytest.fixture
+def cross_device(monkeypatch):
+    """Make every rename fail as if source and destination were on different devices."""
+
+    def rename(src, dst):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "rename", rename)
+
+
+def _interrupted_run(tmp_path):
+    """Source folder and a checkpoint whose copies were cut short by a crash."""
+    source = tmp_path / "source"
+    dest = tmp_path / "dest" / "Docs"
+    source.mkdir()
+    dest.mkdir(parents=True)
+    for name in ("a", "b", "c"):
+        (source / f"{name}.txt").write_bytes(name.encode() * 100)
+
+    checkpoint_path = str(tmp_path / "state.jsonl")
+    checkpoint = Checkpoint(checkpoint_path, "collect", str(source))
+    checkpoint.load()
+    for name in ("a", "b"):
+        checkpoint.record_plan(
+            str(source / f"{name}.txt"), str(dest / f"{name}.txt"), "Docs"
+        )
+    return source, dest, checkpoint_path
+
+
+def _copy_as_move_file(src, dst):
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        fdst.write(fsrc.read())
+    st = os.stat(src)
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def test_resume_finishes_and_cleans_interrupted_copies(tmp_path, cross_device):
+    source, dest, checkpoint_path = _interrupted_run(tmp_path)
+    # 'a' died mid-copy; 'b' was copied but its source not yet removed
+    with open(partial_path(str(dest / "a.txt")), "wb") as f:
+        f.write(b"a" * 10)
+    _copy_as_move_file(source / "b.txt", dest / "b.txt")
+
+    collector = FileCollector(
+        str(source), str(tmp_path / "dest"), {"Docs": ["txt"]},
+        checkpoint_path=checkpoint_path,
+    )
+    collector.collect()
+
+    assert sorted(os.listdir(dest)) == ["a.txt", "b.txt", "c.txt"]
+    assert os.listdir(source) == []
+    assert (dest / "a.txt").read_bytes() == b"a" * 100
+    assert collector._get_results()["total_files_moved"] == 3
+    assert collector.errors == []
+
+
+def test_resume_keeps_a_source_changed_after_the_crash(tmp_path, cross_device):
+    source, dest, checkpoint_path = _interrupted_run(tmp_path)
+    _copy_as_move_file(source / "b.txt", dest / "b.txt")
+    # Edited before the restart: same size, new content and mtime
+    (source / "b.txt").write_bytes(b"B" * 100)
+    st = os.stat(dest / "b.txt")
+    os.utime(source / "b.txt", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    collector = FileCollector(
+        str(source), str(tmp_path / "dest"), {"Docs": ["txt"]},
+        checkpoint_path=checkpoint_path,
+    )
+    collector.collect()
+
+    assert (dest / "b.txt").read_bytes() == b"b" * 100
+    assert (dest / "b_1.txt").read_bytes() == b"B" * 100
+    assert len(collector.errors) == 1 and "both kept" in collector.errors[0]
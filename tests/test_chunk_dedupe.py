@@ -0,0 +1,74 @@
+import os
+import random
+
+import pytest
+
+from core import chunk_dedupe
+from core.chunk_dedupe import ChunkDedupeAnalyzer, chunk_file
+
+
+def _random_bytes(size: int, seed: int) -> bytes:
+    return random.Random(seed).randbytes(size)
+
+
+@pytest.mark.parametrize("avg_size", [256, 4096, 64 * 1024])
+@pytest.mark.parametrize("size", [0, 100, 5000, 300 * 1024])
+def test_numpy_and_python_cut_points_match(size, avg_size):
+    pytest.importorskip("numpy")
+    data = _random_bytes(size, seed=size + avg_size)
+    min_size, max_size = max(32, avg_size // 4), avg_size * 4
+    bits = avg_size.bit_length() - 1
+    mask = ((1 << bits) - 1) << (32 - bits)
+
+    assert chunk_dedupe._cut_points_numpy(
+        data, min_size, max_size, mask
+    ) == chunk_dedupe._cut_points_python(data, min_size, max_size, mask)
+
+
+def test_chunk_file_is_the_same_with_and_without_numpy(tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    path = tmp_path / "data.bin"
+    path.write_bytes(_random_bytes(600 * 1024, seed=1))
+
+    with_numpy = chunk_file(str(path), 1024, 4096, 16384, read_size=100 * 1024)
+    monkeypatch.setattr(chunk_dedupe, "np", None)
+    without_numpy = chunk_file(str(path), 1024, 4096, 16384, read_size=100 * 1024)
+    assert with_numpy == without_numpy
+
+
+def test_insertion_only_changes_nearby_chunks(tmp_path):
+    data = _random_bytes(400 * 1024, seed=2)
+    original = tmp_path / "a.bin"
+    edited = tmp_path / "b.bin"
+    original.write_bytes(data)
+    edited.write_bytes(data[:1000] + b"inserted" + data[1000:])
+
+    _, _, digests_a, _ = chunk_file(str(original), 1024, 4096, 16384)
+    _, _, digests_b, _ = chunk_file(str(edited), 1024, 4096, 16384)
+    chunks_a = {digests_a[i : i + 8] for i in range(0, len(digests_a), 8)}
+    chunks_b = {digests_b[i : i + 8] for i in range(0, len(digests_b), 8)}
+    assert len(chunks_a & chunks_b) >= len(chunks_a) - 3
+
+
+def test_analyzer_reports_shared_chunks(tmp_path):
+    data = _random_bytes(256 * 1024, seed=3)
+    (tmp_path / "one").mkdir()
+    (tmp_path / "one" / "a.bin").write_bytes(data)
+    (tmp_path / "one" / "b.bin").write_bytes(data[:128 * 1024] + _random_bytes(128 * 1024, 4))
+    (tmp_path / "c.bin").write_bytes(_random_bytes(256 * 1024, seed=5))
+
+    analyzer = ChunkDedupeAnalyzer(
+        str(tmp_path), min_file_size=1, avg_chunk_size=4096, workers=2
+    )
+    analyzer.analyze()
+    results = analyzer._get_results()
+
+    assert results["total_files"] == 3
+    assert 0 < results["potential_savings"] < 256 * 1024
+    assert list(analyzer.chunk_digests) == sorted(set(analyzer.chunk_digests))
+    pair = results["pairs"][0]
+    assert {os.path.basename(pair["file_a"]), os.path.basename(pair["file_b"])} == {
+        "a.bin",
+        "b.bin",
+    }
+    assert results["folders"][0]["folder"] == str(tmp_path / "one")
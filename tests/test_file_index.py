@@ -0,0 +1,59 @@
+import os
+import sys
+
+import pytest
+
+from core.file_index import FileIndex
+from core.folder_analyzer import FolderAnalyzer
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs bytes file names")
+@pytest.mark.parametrize("incremental", [False, True])
+def test_undecodable_file_names_are_indexed(tmp_path, incremental):
+    root = tmp_path / "root"
+    root.mkdir()
+    bad_name = os.fsdecode(b"bad\xff.txt")
+    (root / bad_name).write_bytes(b"1234")
+    (root / "good.txt").write_bytes(b"12")
+
+    analyzer = FolderAnalyzer(
+        str(root),
+        index_path=str(tmp_path / "index.db"),
+        snapshot_path=str(tmp_path / "snapshot.db") if incremental else None,
+    )
+    analyzer.analyze()
+    try:
+        top = analyzer.file_index.top_n(5)
+    finally:
+        analyzer.close()
+
+    assert [path for path, _, _ in top] == [
+        os.path.join(str(root), bad_name),
+        os.path.join(str(root), "good.txt"),
+    ]
+
+
+def test_index_of_another_folder_is_rebuilt(tmp_path):
+    first, second = tmp_path / "first", tmp_path / "second"
+    for root in (first, second):
+        root.mkdir()
+        (root / "file.txt").write_bytes(b"data")
+    index_path = str(tmp_path / "index.db")
+
+    analyzer = FolderAnalyzer(
+        str(first), index_path=index_path, snapshot_path=str(tmp_path / "a.db")
+    )
+    analyzer.analyze()
+    analyzer.close()
+    analyzer = FolderAnalyzer(
+        str(second), index_path=index_path, snapshot_path=str(tmp_path / "b.db")
+    )
+    analyzer.analyze()
+    analyzer.close()
+
+    index = FileIndex(index_path, str(second))
+    try:
+        assert index.matches_base()
+        assert [path for path, _, _ in index.top_n()] == [str(second / "file.txt")]
+    finally:
+        index.close()
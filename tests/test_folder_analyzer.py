@@ -0,0 +1,74 @@
+import os
+import shutil
+
+from core.folder_analyzer import FolderAnalyzer
+
+
+def _tree(root):
+    for top in ("a", "b"):
+        for sub in ("x", "y"):
+            folder = root / top / sub
+            folder.mkdir(parents=True)
+            for n in range(3):
+                (folder / f"{n}.bin").write_bytes(b"." * 100)
+
+
+def _analyze(root, snapshot):
+    analyzer = FolderAnalyzer(str(root), unit="B", snapshot_path=str(snapshot))
+    analyzer.analyze()
+    return analyzer
+
+
+def test_rerun_without_changes_lists_nothing(tmp_path):
+    root = tmp_path / "root"
+    _tree(root)
+    snapshot = tmp_path / "snapshot.db"
+    _analyze(root, snapshot)
+
+    analyzer = _analyze(root, snapshot)
+    results = analyzer._get_results()
+
+    assert analyzer.dirs_listed == 0
+    assert results["total_files"] == 12 and results["total_size"] == 1200
+    assert results["diff"]["added_files"] == []
+
+
+def test_rerun_reports_changes_with_subtree_totals(tmp_path):
+    root = tmp_path / "root"
+    _tree(root)
+    snapshot = tmp_path / "snapshot.db"
+    _analyze(root, snapshot)
+
+    (root / "a" / "x" / "new.bin").write_bytes(b"." * 500)
+    shutil.rmtree(root / "b" / "y")
+    analyzer = _analyze(root, snapshot)
+    results = analyzer._get_results()
+    diff = results["diff"]
+
+    assert analyzer.dirs_listed == 2
+    assert diff["added_files"] == [(str(root / "a" / "x" / "new.bin"), 500)]
+    assert diff["removed_folders"] == [str(root / "b" / "y")]
+    assert len(diff["removed_files"]) == 3
+    assert diff["size_delta"] == 200
+    # Growth is reported for every folder whose subtree grew
+    assert dict(diff["grown_folders"]) == {
+        str(root / "a" / "x"): 500,
+        str(root / "a"): 500,
+        str(root): 200,
+    }
+    assert results["folders_info"][str(root)]["tree_size"] == 1400
+    assert results["total_files"] == 10 and len(results["top_files"]) == 10
+
+
+def test_snapshot_of_another_folder_is_not_reused(tmp_path):
+    first, second = tmp_path / "first", tmp_path / "second"
+    _tree(first)
+    _tree(second)
+    snapshot = tmp_path / "snapshot.db"
+    _analyze(first, snapshot)
+
+    analyzer = _analyze(second, snapshot)
+
+    assert analyzer._get_diff() is None
+    top_files = analyzer._get_results()["top_files"]
+    assert all(path.startswith(str(second) + os.sep) for path, _ in top_files)
@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+from core.hash_index import ShardedDuplicateScanner, build_root_index, read_index
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs bytes file names")
+def test_undecodable_file_names_are_indexed(tmp_path):
+    root = tmp_path / "root"
+    root.mkdir()
+    bad_name = os.fsdecode(b"bad\xff.txt")
+    (root / bad_name).write_bytes(b"same")
+    (root / "good.txt").write_bytes(b"same")
+
+    index_path = str(tmp_path / "root.idx")
+    _, count, errors = build_root_index(str(root), index_path)
+
+    assert count == 2 and errors == []
+    paths = {path for _, _, path in read_index(index_path)}
+    assert os.path.join(str(root), bad_name) in paths
+
+
+def test_duplicates_are_found_across_roots(tmp_path):
+    roots = []
+    for name in ("a", "b"):
+        root = tmp_path / name
+        root.mkdir()
+        (root / "copy.txt").write_bytes(b"shared content")
+        (root / f"only_{name}.txt").write_bytes(name.encode())
+        roots.append(str(root))
+
+    scanner = ShardedDuplicateScanner(roots, str(tmp_path / "indexes"), workers=2)
+    scanner.scan()
+
+    assert len(scanner.duplicate_groups) == 1
@@ -0,0 +1,66 @@
+import os
+
+from core.results_store import ResultStore
+
+
+def test_only_path_lists_become_rows(tmp_path):
+    base = str(tmp_path / "dest")
+    store = ResultStore(base_path=base)
+    store.load_results(
+        {
+            "total_files_moved": 2,
+            "categories": ["images"],
+            "files_by_category": {
+                "images": [os.path.join(base, "images", "a.jpg")],
+            },
+            "duplicates_list": [os.path.join(base, "b.jpg")],
+            "errors": [os.path.join(base, "c.jpg") + ": Permission denied"],
+            "archive": {
+                "volumes": [os.path.join(base, "archive-0001.tar")],
+                "errors": [],
+            },
+            "verification": {"failed": [{"path": base, "reason": "missing"}]},
+        }
+    )
+    try:
+        rows = {(category, folder, name) for _, category, folder, name, _ in store.page()}
+        summary = dict(store.summary())
+    finally:
+        store.close()
+
+    assert rows == {("images", "images", "a.jpg"), ("duplicates_list", ".", "b.jpg")}
+    assert summary["categories"] == "images"
+    assert summary["errors"].endswith(": Permission denied")
+    assert summary["archive.volumes"].endswith("archive-0001.tar")
+    assert summary["archive.errors"] == ""
+    assert "missing" in summary["verification.failed"]
+
+
+def test_sibling_of_base_path_keeps_its_full_path(tmp_path):
+    base = str(tmp_path / "dest")
+    store = ResultStore(base_path=base)
+    store.add("moved", os.path.join(base, "a.txt"))
+    store.add("moved", os.path.join(base + "-old", "b.txt"))
+    store.flush()
+    try:
+        rows = [(folder, name) for _, _, folder, name, _ in store.page()]
+    finally:
+        store.close()
+
+    assert rows == [(".", "a.txt"), (base + "-old", "b.txt")]
+
+
+def test_undecodable_names_are_stored_escaped(tmp_path):
+    base = str(tmp_path)
+    bad_name = os.fsdecode(b"bad\xff.txt")
+    store = ResultStore(base_path=base)
+    store.add("moved", os.path.join(base, bad_name), f"{bad_name}: error")
+    store.load_results({"errors": [f"{bad_name}: error"]})
+    try:
+        [(_, _, folder, name, detail)] = store.page()
+        summary = dict(store.summary())
+    finally:
+        store.close()
+
+    assert (folder, name, detail) == (".", "bad\\xff.txt", "bad\\xff.txt: error")
+    assert summary["errors"] == "bad\\xff.txt: error"
@@ -0,0 +1,33 @@
+import threading
+import time
+
+import core.verifier
+from core.hashing import compute_file_hash
+from core.io_scheduler import IOScheduler
+from core.verifier import IntegrityVerifier
+
+
+def test_reads_hold_scheduler_slots(tmp_path, monkeypatch):
+    expected = {}
+    for i in range(8):
+        path = tmp_path / f"file{i}.bin"
+        path.write_bytes(b"x" * (i + 1))
+        expected[str(path)] = (i + 1, compute_file_hash(str(path)))
+
+    scheduler = IOScheduler(max_workers=2)
+    lock = threading.Lock()
+    seen = []
+
+    def slow_hash(path, scheduler=None):
+        with lock:
+            seen.append(scheduler._active)
+        time.sleep(0.02)
+        return compute_file_hash(path)
+
+    monkeypatch.setattr(core.verifier, "compute_file_hash", slow_hash)
+    verifier = IntegrityVerifier(expected, workers=8, io_scheduler=scheduler)
+    verifier.verify()
+
+    assert verifier.workers == 2
+    assert len(verifier.verified) == 8
+    assert seen and max(seen) <= 2 and min(seen) >= 1